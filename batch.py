@@ -0,0 +1,230 @@
+import argparse
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Type, Optional, TextIO
+
+from ansi import ANSI
+from client.client import Client
+from client.pool import ClientPool
+from config import Config
+from crypto.algorithm import Algorithm
+from crypto.rsa_encryption import RSAEncryption
+from crypto.shift_encryption import ShiftEncryption
+from crypto.vigenere_encryption import VigenereEncryption
+from logger import Logger
+from utils import formatException
+
+
+class BatchRunner:
+    """
+    Class to run many server tasks without user interaction
+
+    Jobs are read from a manifest file, executed concurrently on a pool of
+    clients and their results are streamed to an output file as JSON lines
+    """
+
+    ALGORITHMS: dict[str, Type[Algorithm]] = {
+        algorithm.NAME.lower(): algorithm
+        for algorithm in (ShiftEncryption, VigenereEncryption, RSAEncryption)
+    }
+    MODES = ("encode", "decode")
+    # Decoding needs the algorithm to implement `decryptTask`
+    SUPPORTED_MODES: dict[str, tuple[str, ...]] = {
+        name: ("encode", "decode") if algorithm.decryptTask is not Algorithm.decryptTask else ("encode",)
+        for name, algorithm in ALGORITHMS.items()
+    }
+
+    ENCODE_SUCCESS = "The encoding is correct !"
+    DECODE_SUCCESS = "The message is correct !"
+
+    def __init__(self, pool: ClientPool, concurrency: Optional[int] = None) -> None:
+        self.pool: ClientPool = pool
+        self.concurrency: int = pool.size if concurrency is None else concurrency
+        self.outputLock: threading.Lock = threading.Lock()
+        self.logger = Logger("Batch", styles={
+            "info": [],
+            "error": [ANSI.RED, ANSI.BOLD],
+            "warning": [ANSI.YELLOW, ANSI.ITALIC],
+            "success": [ANSI.LGREEN, ANSI.ITALIC]
+        })
+
+    @staticmethod
+    def loadManifest(path: str) -> list[dict]:
+        """
+        Loads the jobs of a manifest file
+
+        The manifest is either a JSON lines file (one object per line) or a CSV
+        file with a header, both with the `algorithm`, `mode` and `size` fields
+        Args:
+            path: the manifest file path
+        Returns:
+            the list of jobs
+        Raises:
+            ValueError: if some jobs are invalid, listing the error of each invalid row
+        """
+
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            if os.path.splitext(path)[1].lower() == ".csv":
+                rows = list(csv.DictReader(f))
+            else:
+                rows = [json.loads(line) for line in f if line.strip()]
+
+        jobs = []
+        errors = []
+        for i, row in enumerate(rows, 1):
+            try:
+                jobs.append(BatchRunner.parseJob(row))
+            except ValueError as e:
+                errors.append(f"row {i}: {e}")
+
+        if errors:
+            raise ValueError(f"Invalid jobs in {path}:\n" + "\n".join(errors))
+
+        return jobs
+
+    @staticmethod
+    def parseJob(row: dict) -> dict:
+        """
+        Validates and normalizes a manifest entry
+        Args:
+            row: the raw manifest entry
+        Returns:
+            the job, with the `algorithm`, `mode` and `size` fields
+        Raises:
+            ValueError: if the algorithm or mode is unknown, the algorithm does not support the mode,
+                or the size is invalid
+        """
+
+        algorithm = str(row.get("algorithm", "")).strip().lower()
+        mode = str(row.get("mode", "")).strip().lower()
+
+        try:
+            size = int(row.get("size", 0))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid size '{row.get('size')}', must be an integer") from None
+
+        if algorithm not in BatchRunner.ALGORITHMS:
+            raise ValueError(f"Unknown algorithm '{algorithm}'")
+
+        if mode not in BatchRunner.MODES:
+            raise ValueError(f"Unknown mode '{mode}', must be one of {BatchRunner.MODES}")
+
+        supportedModes = BatchRunner.SUPPORTED_MODES[algorithm]
+        if mode not in supportedModes:
+            raise ValueError(f"Algorithm '{algorithm}' does not support mode '{mode}', "
+                             f"must be one of {supportedModes}")
+
+        if size < 1:
+            raise ValueError(f"Invalid size {size}, must be at least 1")
+
+        return {"algorithm": algorithm, "mode": mode, "size": size}
+
+    def run(self, jobs: list[dict], output: TextIO) -> list[dict]:
+        """
+        Executes jobs concurrently and writes each result as soon as it is known
+        Args:
+            jobs: the jobs to execute
+            output: the file to write the results to (one JSON object per line)
+        Returns:
+            the results, in the same order as the jobs
+        """
+
+        start = time.perf_counter()
+
+        def execute(index: int) -> dict:
+            result = self.runJob(index, jobs[index])
+            with self.outputLock:
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = list(executor.map(execute, range(len(jobs))))
+
+        duration = time.perf_counter() - start
+        successes = sum(result["success"] for result in results)
+        self.logger.log(f"{successes}/{len(results)} tasks succeeded in {duration:.2f}s "
+                        f"({len(results) / duration:.1f} tasks/s)", "success" if successes == len(results) else "warning")
+
+        return results
+
+    def runJob(self, index: int, job: dict) -> dict:
+        """
+        Executes a single job on a leased client
+        Args:
+            index: the index of the job in the manifest
+            job: the job to execute
+        Returns:
+            the result of the job, with its success, latency and error if any
+        """
+
+        result = dict(job, index=index, success=False, latency=None, error=None)
+        start = time.perf_counter()
+
+        try:
+            with self.pool.lease() as client:
+                result["success"] = self.runTask(client, job)
+
+        except Exception as e:
+            result["error"] = formatException(e)
+
+        result["latency"] = time.perf_counter() - start
+        return result
+
+    def runTask(self, client: Client, job: dict) -> bool:
+        """
+        Performs the dialogue of a task with the server
+        Args:
+            client: the client to use
+            job: the job describing the task
+        Returns:
+            true if the server validated the result, false otherwise
+        """
+
+        algorithm: Type[Algorithm] = self.ALGORITHMS[job["algorithm"]]
+        decrypt: bool = job["mode"] == "decode"
+
+        client.send(f"task {algorithm.NAME} {job['mode']} {job['size']}", True)
+
+        if not decrypt:
+            key = algorithm.parseTaskKey(client.receive())
+            plaintextMsg = client.receive()
+
+            client.send(algorithm(key).encode(plaintextMsg), True)
+
+            return client.receive() == self.ENCODE_SUCCESS
+
+        taskMsg = client.receive()
+        algorithm.decryptTask(taskMsg, client.send, client.receive)
+
+        return client.receive() == self.DECODE_SUCCESS
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs server tasks listed in a manifest file")
+    parser.add_argument("manifest", help="JSON lines or CSV file of (algorithm, mode, size) jobs")
+    parser.add_argument("-o", "--output", help="results file (JSON lines), defaults to <manifest>_results.jsonl")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="number of tasks running simultaneously")
+    parser.add_argument("--host", default=Config.HOST, help="server host")
+    parser.add_argument("--port", type=int, default=Config.PORT, help="server port")
+    args = parser.parse_args()
+
+    outputPath = args.output
+    if outputPath is None:
+        outputPath = os.path.splitext(args.manifest)[0] + "_results.jsonl"
+
+    try:
+        manifestJobs = BatchRunner.loadManifest(args.manifest)
+    except ValueError as e:
+        parser.error(str(e))
+    RSAEncryption.createKeyPool(capacity=2 * args.concurrency, lowWater=args.concurrency)
+
+    with ClientPool(args.concurrency, args.host, args.port) as clientPool:
+        with open(outputPath, "w", encoding="utf-8") as outputFile:
+            BatchRunner(clientPool).run(manifestJobs, outputFile)
+
+    print(f"Results saved in {outputPath}")
@@ -0,0 +1,74 @@
+import argparse
+import os
+import random
+import timeit
+
+from crypto.rsa_encryption import RSAEncryption
+
+
+class RSADecodeBenchmark:
+    """
+    Compares serial and parallel RSA decryption, to find from which key size
+    and number of distinct blocks the shared process pool pays off
+
+    `RSAEncryption.decode` only decrypts each distinct block once, so a
+    message holds at most a few hundred values to decrypt, whatever its length
+    """
+
+    KEY_SIZES = (None, 512, 1024, 2048)
+    BLOCK_COUNTS = (16, 32, 64, 128, 256)
+
+    def __init__(self, workers: int, runs: int = 5) -> None:
+        self.workers: int = workers
+        self.runs: int = runs
+
+    def measure(self, rsa: RSAEncryption, count: int) -> tuple[float, float]:
+        """
+        Times the decryption of random values, serially and in parallel
+        Args:
+            rsa: the encryption, with its private key
+            count: the number of (distinct) values
+        Returns:
+            the average serial and parallel durations, in seconds
+        """
+
+        n = rsa.publicKey[0]
+        values = [random.randrange(2, n) for _ in range(count)]
+        assert rsa.decryptParallel(values, self.workers) == rsa.decryptChunk(values)
+
+        serial = timeit.timeit(lambda: rsa.decryptChunk(values), number=self.runs) / self.runs
+        parallel = timeit.timeit(lambda: rsa.decryptParallel(values, self.workers), number=self.runs) / self.runs
+
+        return serial, parallel
+
+    def runAll(self) -> None:
+        """Measures every key size and number of blocks, and prints the smallest winning number of blocks"""
+
+        # Starts the workers, so their startup is not measured (they are reused by every decryption)
+        RSAEncryption.getExecutor(self.workers)
+
+        for bits in self.KEY_SIZES:
+            public, private = RSAEncryption.generateKeyPair(bits)
+            rsa = RSAEncryption(public, private)
+            bits = public[0].bit_length()
+            breakEven = None
+
+            for count in self.BLOCK_COUNTS:
+                serial, parallel = self.measure(rsa, count)
+                if breakEven is None and parallel < serial:
+                    breakEven = count
+
+                print(f"{bits:>5} bits {count:>4} blocks | serial {serial * 1000:8.3f}ms | "
+                      f"parallel {parallel * 1000:8.3f}ms (x{serial / parallel:5.2f})")
+
+            print(f"{bits:>5} bits: parallel decryption pays off "
+                  f"{'from ' + str(breakEven) + ' blocks' if breakEven else 'never (up to ' + str(count) + ' blocks)'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Finds where parallel RSA decryption becomes faster than serial")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("-r", "--runs", type=int, default=5, help="number of runs per measurement")
+    args = parser.parse_args()
+
+    RSADecodeBenchmark(args.workers, args.runs).runAll()
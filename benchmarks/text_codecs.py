@@ -0,0 +1,254 @@
+import argparse
+import timeit
+from typing import Callable
+
+from client.protocol import Protocol
+from crypto.shift_encryption import ShiftEncryption
+from crypto.vigenere_encryption import VigenereEncryption
+
+
+class ReferenceCodecs:
+    """
+    Character by character implementations of the text codecs, as they were
+    before being rewritten to process whole messages at once
+
+    They are only used to check that the bulk codecs produce the same output
+    and to measure the speedup
+    """
+
+    @staticmethod
+    def encodeTextPayload(payload: str) -> bytes:
+        """
+        Reference implementation of `Protocol.encodeTextPayload`
+        Args:
+            payload: the text message to encode
+
+        Returns:
+            the encoded message bytes (only contains length and message)
+        """
+
+        byteList = []
+
+        byteList += len(payload).to_bytes(2, "big")
+
+        for char in payload:
+            charBytes = char.encode("utf-8").rjust(Protocol.BYTE_SIZE, b"\0")
+            byteList += charBytes
+
+        return bytes(byteList)
+
+    @staticmethod
+    def decodeTextPayload(payloadBytes: bytes) -> str:
+        """
+        Reference implementation of `Protocol.decodeTextPayload`
+        Args:
+            payloadBytes: the encoded payload bytes
+
+        Returns:
+            the decoded text message
+        """
+
+        length = int.from_bytes(payloadBytes[:2], "big")
+        textBytes = []
+        for i in range(length):
+            pos = 2 + i * Protocol.BYTE_SIZE
+            charBytes = payloadBytes[pos:pos + Protocol.BYTE_SIZE].lstrip(b"\0")
+            textBytes += charBytes
+
+        return bytes(textBytes).decode("utf-8")
+
+    @staticmethod
+    def vigenereEncode(key: str, plaintext: str) -> bytes:
+        """Reference implementation of `VigenereEncryption.encode`"""
+
+        count = 0
+        out = b""
+        for i in range(len(plaintext)):
+            plainChar = Protocol.charToInt(plaintext[i])
+            keyChar = Protocol.charToInt(key[count])
+
+            encodedValue = plainChar + keyChar
+            out += Protocol.intToPaddedBytes(encodedValue)
+            count += 1
+            if count == len(key):
+                count = 0
+        return out
+
+    @staticmethod
+    def vigenereDecode(key: str, ciphertext: bytes) -> str:
+        """Reference implementation of `VigenereEncryption.decode` (single-byte characters only)"""
+
+        ints = Protocol.groupBytesIntoInt(ciphertext)
+        out = []
+        count = 0
+
+        for i in range(len(ints)):
+            keyChar = int.from_bytes(key[count].encode("utf-8"), "big")
+            out.append(ints[i] - keyChar)
+            count += 1
+            if count == len(key):
+                count = 0
+
+        return bytes(out).decode("UTF-8")
+
+    @staticmethod
+    def shiftEncode(key: int, plaintext: str) -> bytes:
+        """Reference implementation of `ShiftEncryption.encode`"""
+
+        out = b""
+
+        for i in range(len(plaintext)):
+            value = Protocol.charToInt(plaintext[i])
+            encodedValue = value + key
+
+            out += Protocol.intToPaddedBytes(encodedValue)
+
+        return out
+
+    @staticmethod
+    def shiftDecode(key: int, ciphertext: bytes) -> str:
+        """Reference implementation of `ShiftEncryption.decode` (single-byte characters only)"""
+
+        ints = Protocol.groupBytesIntoInt(ciphertext)
+        out = []
+
+        for i in range(len(ints)):
+            out.append(ints[i] - key)
+
+        return bytes(out).decode("UTF-8")
+
+
+class CodecBenchmark:
+    """
+    Checks that the bulk text codecs match their reference implementations
+    (see `ReferenceCodecs`) and compares their speed
+    """
+
+    SAMPLES = {
+        "ascii": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. ",
+        "accents": "Les fientes aviaires résultent d'un mélange d'urine et de fèces. "
+    }
+    SIZES = (1_000, 10_000, 65_535)
+
+    def __init__(self, runs: int = 10) -> None:
+        self.runs: int = runs
+
+    @staticmethod
+    def getText(sample: str, size: int) -> str:
+        return (sample * (size // len(sample) + 1))[:size]
+
+    def compare(self, label: str, operations: dict[str, tuple[Callable[[], object], Callable[[], object]]]) -> dict:
+        """
+        Times reference and bulk implementations of some operations and prints the speedups on one line
+        Args:
+            label: the name of the measured case
+            operations: for each operation name, its reference and bulk implementations
+        Returns:
+            for each operation name, the average duration of the reference and bulk implementations, in seconds
+        """
+
+        timings = {}
+        columns = [label]
+
+        for name, (reference, bulk) in operations.items():
+            oldTime = timeit.timeit(reference, number=self.runs) / self.runs
+            newTime = timeit.timeit(bulk, number=self.runs) / self.runs
+            timings[name] = (oldTime, newTime)
+            columns.append(f"{name}: {oldTime * 1000:8.3f}ms -> {newTime * 1000:7.3f}ms (x{oldTime / newTime:6.1f})")
+
+        print(" | ".join(columns))
+        return timings
+
+    def benchmarkProtocol(self) -> None:
+        """Benchmarks `Protocol.encodeTextPayload` and `Protocol.decodeTextPayload`"""
+
+        for name, sample in self.SAMPLES.items():
+            for size in self.SIZES:
+                text = self.getText(sample, size)
+                encoded = Protocol.encodeTextPayload(text)
+                assert encoded == ReferenceCodecs.encodeTextPayload(text)
+                assert Protocol.decodeTextPayload(encoded) == ReferenceCodecs.decodeTextPayload(encoded) == text
+
+                # Truncated payloads are decoded leniently by both implementations
+                for end in range(len(encoded) - 2 * Protocol.BYTE_SIZE, len(encoded)):
+                    try:
+                        expected = ReferenceCodecs.decodeTextPayload(encoded[:end])
+                    except UnicodeDecodeError:
+                        continue
+                    assert Protocol.decodeTextPayload(encoded[:end]) == expected
+
+                self.compare(f"protocol {name:>8} {size:>6} chars", {
+                    "encode": (
+                        lambda: ReferenceCodecs.encodeTextPayload(text),
+                        lambda: Protocol.encodeTextPayload(text)
+                    ),
+                    "decode": (
+                        lambda: ReferenceCodecs.decodeTextPayload(encoded),
+                        lambda: Protocol.decodeTextPayload(encoded)
+                    )
+                })
+
+    def benchmarkVigenere(self, key: str = "ISC") -> None:
+        """Benchmarks `VigenereEncryption.encode` and `VigenereEncryption.decode`"""
+
+        vig = VigenereEncryption(key)
+
+        for plaintext in ("a\x00fY", "\x00", "héllo\x00 ✓", "Ça coûte 3€"):
+            assert vig.encode(plaintext) == ReferenceCodecs.vigenereEncode(key, plaintext)
+
+        for size in self.SIZES:
+            text = self.getText(self.SAMPLES["ascii"], size)
+            encoded = vig.encode(text)
+            assert encoded == ReferenceCodecs.vigenereEncode(key, text)
+            assert vig.decode(encoded) == ReferenceCodecs.vigenereDecode(key, encoded) == text
+
+            self.compare(f"vigenere {'ascii':>8} {size:>6} chars", {
+                "encode": (
+                    lambda: ReferenceCodecs.vigenereEncode(key, text),
+                    lambda: vig.encode(text)
+                ),
+                "decode": (
+                    lambda: ReferenceCodecs.vigenereDecode(key, encoded),
+                    lambda: vig.decode(encoded)
+                )
+            })
+
+    def benchmarkShift(self, key: int = 3) -> None:
+        """Benchmarks `ShiftEncryption.encode` and `ShiftEncryption.decode`"""
+
+        shift = ShiftEncryption(key)
+
+        for plaintext in ("a\x00fY", "~~~", "héllo\x00 ✓", "".join(map(chr, range(0x4E00, 0x6E00)))):
+            assert shift.encode(plaintext) == ReferenceCodecs.shiftEncode(key, plaintext)
+
+        for size in self.SIZES:
+            text = self.getText(self.SAMPLES["ascii"], size)
+            encoded = shift.encode(text)
+            assert encoded == ReferenceCodecs.shiftEncode(key, text)
+            assert shift.decode(encoded) == ReferenceCodecs.shiftDecode(key, encoded) == text
+
+            self.compare(f"{'shift':<8} {'ascii':>8} {size:>6} chars", {
+                "encode": (
+                    lambda: ReferenceCodecs.shiftEncode(key, text),
+                    lambda: shift.encode(text)
+                ),
+                "decode": (
+                    lambda: ReferenceCodecs.shiftDecode(key, encoded),
+                    lambda: shift.decode(encoded)
+                )
+            })
+
+    def runAll(self) -> None:
+        """Runs every benchmark"""
+
+        self.benchmarkProtocol()
+        self.benchmarkVigenere()
+        self.benchmarkShift()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares the bulk text codecs with their per-character references")
+    parser.add_argument("-r", "--runs", type=int, default=10, help="number of runs per measurement")
+    args = parser.parse_args()
+
+    CodecBenchmark(args.runs).runAll()
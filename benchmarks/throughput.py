@@ -0,0 +1,248 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TextIO
+
+from PIL import Image
+
+from batch import BatchRunner
+from client.client import Client, MessageListener
+from client.pool import ClientPool
+from client.protocol import Protocol
+from server.mock_server import MockServer
+from utils import getRootPath
+
+
+class ByteCounter(MessageListener):
+    """Listener counting the bytes of every message it sees"""
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.lock: threading.Lock = threading.Lock()
+
+    def onMessage(self, msgBytes: bytes) -> None:
+        with self.lock:
+            self.count += len(msgBytes)
+
+
+class ThroughputBenchmark:
+    """
+    Measures end-to-end task and message throughput against a loopback `MockServer`
+
+    Every scenario runs a number of operations on a pool of clients and
+    reports the throughput (operations and bytes per second) and the latency
+    percentiles of the operations
+    """
+
+    TASKS = [
+        ("shift", "encode"),
+        ("vigenere", "encode"),
+        ("rsa", "encode"),
+        ("rsa", "decode")
+    ]
+    TEXT_SIZES = [10, 100, 1_000, 10_000]
+    IMAGE_SIZES = [16, 64, 128]
+
+    def __init__(self, concurrency: int = 4, count: int = 50, logFile: Optional[TextIO] = None) -> None:
+        """
+        Args:
+            concurrency: the number of clients running simultaneously
+            count: the number of operations per scenario
+            logFile: the file receiving the output of the scenarios (task values, pool reconnections
+                and warnings). If None, the output is discarded
+        """
+
+        self.concurrency: int = concurrency
+        self.count: int = count
+        self.logFile: Optional[TextIO] = logFile
+        self.server: MockServer = MockServer(port=0)
+        self.loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self.thread: threading.Thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def __enter__(self) -> "ThroughputBenchmark":
+        self.loop.run_until_complete(self.server.start())
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        asyncio.run_coroutine_threadsafe(self.server.stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    def runAll(self) -> list[dict]:
+        """
+        Runs every scenario
+        Returns:
+            the results of every scenario
+        """
+
+        results = []
+
+        for algorithm, mode in self.TASKS:
+            for size in self.TEXT_SIZES:
+                job = BatchRunner.parseJob({"algorithm": algorithm, "mode": mode, "size": size})
+                results.append(self.measure(
+                    f"task {algorithm} {mode}", size,
+                    lambda client, runner, job=job: runner.runTask(client, job)
+                ))
+
+        for size in self.TEXT_SIZES:
+            text = ("La taille des selles animales varie fortement. " * size)[:size]
+            results.append(self.measure(
+                "text frame", size,
+                lambda client, runner, text=text: self.echo(client, text),
+                concurrency=1
+            ))
+
+        for size in self.IMAGE_SIZES:
+            image = Image.new("RGB", (size, size), (200, 100, 50))
+            results.append(self.measure(
+                "image frame", size * size,
+                lambda client, runner, image=image: self.echo(client, image),
+                concurrency=1
+            ))
+
+        return results
+
+    def measure(self,
+                name: str,
+                size: int,
+                operation: Callable[[Client, BatchRunner], bool],
+                concurrency: Optional[int] = None) -> dict:
+        """
+        Runs an operation `count` times concurrently and measures its performance
+        Args:
+            name: the name of the scenario
+            size: the message size (characters or pixels)
+            operation: the operation, taking a client and a batch runner and returning its success
+            concurrency: the number of clients to use. If None, uses the benchmark's concurrency
+        Returns:
+            the results of the scenario
+        """
+
+        if concurrency is None:
+            concurrency = self.concurrency
+
+        with ClientPool(concurrency, self.server.host, self.server.port) as pool:
+            runner = BatchRunner(pool)
+            counter = ByteCounter()
+            for client in pool.clients:
+                client.addOnSendListener(counter)
+                client.addOnReceiveListener(counter)
+
+            def timed(_) -> tuple[bool, float]:
+                with pool.lease() as client:
+                    start = time.perf_counter()
+                    success = operation(client, runner)
+                    return success, time.perf_counter() - start
+
+            # Tasks print their intermediate values, which would distort the measurements on
+            # the console, so everything printed meanwhile (pool warnings included) goes to the log file
+            with contextlib.redirect_stdout(self.logFile if self.logFile is not None else io.StringIO()):
+                print(f"===== {name} ({size}) =====")
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    timings = list(executor.map(timed, range(self.count)))
+                duration = time.perf_counter() - start
+
+        latencies = sorted(latency for _, latency in timings)
+        result = {
+            "scenario": name,
+            "size": size,
+            "operations": self.count,
+            "concurrency": concurrency,
+            "successes": sum(success for success, _ in timings),
+            "duration": duration,
+            "opsPerSecond": self.count / duration,
+            "bytesPerSecond": counter.count / duration,
+            "latency": {
+                "p50": self.percentile(latencies, 50),
+                "p95": self.percentile(latencies, 95),
+                "p99": self.percentile(latencies, 99)
+            }
+        }
+
+        print(f"{name:>20} {size:>6} | {result['opsPerSecond']:9.1f} ops/s | "
+              f"{result['bytesPerSecond'] / 1e6:8.2f} MB/s | "
+              f"p50 {result['latency']['p50'] * 1000:8.2f}ms | "
+              f"p95 {result['latency']['p95'] * 1000:8.2f}ms | "
+              f"p99 {result['latency']['p99'] * 1000:8.2f}ms | "
+              f"{result['successes']}/{self.count} ok")
+
+        return result
+
+    @staticmethod
+    def echo(client: Client, msg) -> bool:
+        """
+        Broadcasts a message and waits for the server to send it back
+
+        Broadcasts reach every connected client, so this must run on a single client
+        Args:
+            client: the client to use
+            msg: the text or image to broadcast
+        Returns:
+            true if the message received back is the one that was sent
+        """
+
+        client.send(msg)
+        return client.receive(True) == Protocol.encode(msg)[len(Protocol.MAGIC) + 1:]
+
+    @staticmethod
+    def percentile(values: list[float], percent: float) -> float:
+        """
+        Computes a percentile using the nearest-rank method
+        Args:
+            values: the sorted values
+            percent: the percentile to compute (0-100)
+        Returns:
+            the percentile value
+        """
+
+        if len(values) == 0:
+            return 0.0
+
+        rank = max(0, min(len(values) - 1, math.ceil(percent / 100 * len(values)) - 1))
+        return values[rank]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures task and message throughput against a local mock server")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="number of clients running simultaneously")
+    parser.add_argument("-n", "--count", type=int, default=50, help="number of operations per scenario")
+    parser.add_argument("-o", "--output", help="results file, defaults to benchmarks/results/throughput_<date>.json")
+    parser.add_argument("-l", "--log", help="log file of the scenarios' output, defaults to the results file with a .log extension")
+    args = parser.parse_args()
+
+    outputPath = args.output
+    if outputPath is None:
+        folder = os.path.join(getRootPath(), "benchmarks", "results")
+        os.makedirs(folder, exist_ok=True)
+        outputPath = os.path.join(folder, time.strftime("throughput_%Y%m%d_%H%M%S.json"))
+
+    logPath = args.log
+    if logPath is None:
+        logPath = os.path.splitext(outputPath)[0] + ".log"
+
+    with open(logPath, "w", encoding="utf-8") as logOutput:
+        with ThroughputBenchmark(args.concurrency, args.count, logOutput) as benchmark:
+            scenarios = benchmark.runAll()
+
+    with open(outputPath, "w") as f:
+        json.dump({
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "concurrency": args.concurrency,
+            "count": args.count,
+            "results": scenarios
+        }, f, indent=4)
+
+    print(f"Saved in {outputPath} (log in {logPath})")
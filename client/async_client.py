@@ -0,0 +1,194 @@
+import asyncio
+from typing import Union, Optional, AsyncIterator
+
+from PIL import Image
+
+from ansi import ANSI
+from client.client import MessageListener, NotConnectedError
+from client.protocol import Protocol
+from logger import Logger
+from utils import formatException
+
+
+class AsyncClient:
+    """Asynchronous counterpart of `Client`, based on asyncio streams"""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host: str = host
+        self.port: int = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.logger = Logger("AsyncClient", styles={
+            "info": [],
+            "error": [ANSI.RED, ANSI.BOLD],
+            "warning": [ANSI.YELLOW, ANSI.ITALIC],
+            "success": [ANSI.LGREEN, ANSI.ITALIC]
+        })
+        self.sendListeners: list[MessageListener] = []
+        self.receiveListeners: list[MessageListener] = []
+
+    async def __aenter__(self) -> "AsyncClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.disconnect()
+
+    def __aiter__(self) -> AsyncIterator[Union[str, bytes]]:
+        return self.frames()
+
+    async def connect(self) -> bool:
+        """
+        Tries to connect to the server
+
+        Returns:
+            `True` if the connection was successful, `False` otherwise
+        """
+
+        try:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        except OSError as e:
+            self.reader = None
+            self.writer = None
+            self.logger.error("An error occurred while trying to connect")
+            self.logger.error(formatException(e))
+            return False
+
+        return True
+
+    async def disconnect(self) -> None:
+        """
+        Closes the connection with the server
+        """
+
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+
+        self.reader = None
+        self.writer = None
+
+    async def reconnect(self, host: str, port: int) -> bool:
+        """
+        Tries to reconnect to the server with the new host and port
+        Args:
+            host: the new host
+            port: the new port
+        Returns:
+            `True` if the connection was successful, `False` otherwise
+        """
+
+        await self.disconnect()
+        self.host = host
+        self.port = port
+        return await self.connect()
+
+    async def send(self, msg: Union[bytes, str, Image.Image], onlyServer: bool = False) -> None:
+        """
+        Sends a message
+        Args:
+            msg: the message to send
+            onlyServer: (for text message) whether this message is only sent to the server or broadcast to everyone
+        Raises:
+            TypeError: if the payload is neither a string nor a PIL Image
+            ValueError: if the payload is an image exceeding the size limitations
+            NotConnectedError: if the client is not connected to the server
+        """
+
+        if self.writer is None:
+            raise NotConnectedError("Cannot send messages unless connected to the server")
+
+        payload = Protocol.encode(msg, onlyServer)
+        self._onSend(payload)
+        self.writer.write(payload)
+        await self.writer.drain()
+
+    async def receiveFrame(self) -> bytes:
+        """
+        Waits and reads the raw bytes of a complete frame from the server
+
+        Returns:
+            the frame bytes (magic, type, length and payload)
+        Raises:
+            ProtocolError: if the payload is malformed (missing magic bytes, invalid message type, etc.)
+            NotConnectedError: if the client is not connected to the server
+        """
+
+        if self.reader is None:
+            raise NotConnectedError("Cannot receive messages unless connected to the server")
+
+        try:
+            # Read magic bytes + type byte
+            msgBytes = await self.reader.readexactly(len(Protocol.MAGIC) + 1)
+            lengthBytes = Protocol.getPayloadLengthBytesCount(msgBytes)
+
+            # Read payload size
+            msgBytes += await self.reader.readexactly(lengthBytes)
+            payloadLength = Protocol.getPayloadLength(msgBytes)
+
+            # Read payload
+            msgBytes += await self.reader.readexactly(payloadLength)
+
+        except asyncio.IncompleteReadError as e:
+            raise NotConnectedError("Connection closed by the server") from e
+
+        self._onReceive(msgBytes)
+
+        return msgBytes
+
+    async def receive(self, rawBytes: bool = False) -> Union[str, bytes]:
+        """
+        Waits and reads a message from the server
+
+        Args:
+            rawBytes: whether to receive a structured message (text or image) or raw bytes (i.e. not decoded)
+        Returns:
+            the received message, or an empty string if the format is incorrect
+        Raises:
+            ProtocolError: if the payload is malformed (missing magic bytes, invalid message type, etc.)
+            NotConnectedError: if the client is not connected to the server
+        """
+
+        msgBytes = await self.receiveFrame()
+
+        msg = Protocol.decode(msgBytes, rawBytes)
+        if isinstance(msg, (str, bytes)):
+            return msg
+
+        else:
+            return f"<image ({msg.width}x{msg.height})>"
+
+    async def frames(self, rawBytes: bool = False) -> AsyncIterator[Union[str, bytes]]:
+        """
+        Iterates over the received messages until the connection is closed
+
+        Args:
+            rawBytes: whether to receive structured messages (text or image) or raw bytes (i.e. not decoded)
+        Returns:
+            an asynchronous iterator of received messages
+        Raises:
+            ProtocolError: if a payload is malformed (missing magic bytes, invalid message type, etc.)
+        """
+
+        while self.reader is not None:
+            try:
+                yield await self.receive(rawBytes)
+            except NotConnectedError:
+                return
+
+    def addOnSendListener(self, listener: MessageListener) -> None:
+        self.sendListeners.append(listener)
+
+    def addOnReceiveListener(self, listener: MessageListener) -> None:
+        self.receiveListeners.append(listener)
+
+    def _onReceive(self, msgBytes: bytes) -> None:
+        for listener in self.receiveListeners:
+            listener.onMessage(msgBytes)
+
+    def _onSend(self, msgBytes: bytes) -> None:
+        for listener in self.sendListeners:
+            listener.onMessage(msgBytes)
@@ -13,6 +13,102 @@ class NotConnectedError(Exception):
     ...
 
 
+class FrameReader:
+    """
+    Reads complete protocol frames from a socket into a reusable buffer
+
+    Data is received with `recv_into` directly into a growable buffer, partial
+    reads are accumulated until a whole frame is available and the header is
+    parsed in place
+    """
+
+    HEADER_SIZE = len(Protocol.MAGIC) + 1
+
+    def __init__(self, sock: socket.socket, initialSize: int = 4096) -> None:
+        self.socket: socket.socket = sock
+        self.buffer: bytearray = bytearray(initialSize)
+        self.view: memoryview = memoryview(self.buffer)
+        self.start: int = 0
+        self.end: int = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of received bytes not returned by `readFrame` yet"""
+        return self.end - self.start
+
+    def readFrame(self) -> memoryview:
+        """
+        Waits until a complete frame is received
+
+        Returns:
+            a view on the frame bytes (magic, type, length and payload), only
+            valid until the next call to this method
+        Raises:
+            ProtocolError: if the payload is malformed (missing magic bytes, invalid message type, etc.)
+            NotConnectedError: if the connection was closed by the server
+        """
+
+        # Read magic bytes + type byte
+        self._fill(self.HEADER_SIZE)
+        header = self.view[self.start:self.start + self.HEADER_SIZE]
+        lengthBytes = Protocol.getPayloadLengthBytesCount(header)
+
+        # Read payload size
+        headerSize = self.HEADER_SIZE + lengthBytes
+        self._fill(headerSize)
+        header = self.view[self.start:self.start + headerSize]
+        frameSize = headerSize + Protocol.getPayloadLength(header)
+
+        # Read payload
+        self._fill(frameSize)
+        frame = self.view[self.start:self.start + frameSize]
+        self.start += frameSize
+
+        return frame
+
+    def _fill(self, size: int) -> None:
+        """
+        Receives data until at least `size` unread bytes are buffered
+        Args:
+            size: the number of bytes needed
+        Raises:
+            NotConnectedError: if the connection was closed by the server
+        """
+
+        while self.end - self.start < size:
+            self._reserve(size)
+            received = self.socket.recv_into(self.view[self.end:])
+            if received == 0:
+                raise NotConnectedError("Connection closed by the server")
+            self.end += received
+
+    def _reserve(self, size: int) -> None:
+        """
+        Makes room in the buffer for `size` bytes starting at the unread data
+        Args:
+            size: the number of bytes needed
+        """
+
+        if self.start + size <= len(self.buffer) and self.end < len(self.buffer):
+            return
+
+        pending = self.end - self.start
+
+        # The buffer is still referenced by previously returned frames, so
+        # growing allocates a new one instead of resizing it
+        if size > len(self.buffer):
+            buffer = bytearray(max(size, 2 * len(self.buffer)))
+            buffer[:pending] = self.view[self.start:self.end]
+            self.buffer = buffer
+            self.view = memoryview(buffer)
+
+        else:
+            self.view[:pending] = self.view[self.start:self.end]
+
+        self.start = 0
+        self.end = pending
+
+
 class Client:
     """Simple class to send and receive messages using a TCP socket"""
 
@@ -20,6 +116,7 @@ class Client:
         self.host: str = host
         self.port: int = port
         self.socket: Optional[socket.socket] = None
+        self.reader: Optional[FrameReader] = None
         self.logger = Logger("Client", styles={
             "info": [],
             "error": [ANSI.RED, ANSI.BOLD],
@@ -54,6 +151,7 @@ class Client:
             self.logger.error(formatException(e))
             return False
 
+        self.reader = FrameReader(self.socket)
         return True
 
     def disconnect(self) -> None:
@@ -64,6 +162,7 @@ class Client:
         if self.socket is not None:
             self.socket.close()
             self.socket = None
+            self.reader = None
 
     def send(self, msg: Union[bytes, str, Image.Image], onlyServer: bool = False) -> None:
         """
@@ -100,16 +199,8 @@ class Client:
         if self.socket is None:
             raise NotConnectedError("Cannot receive messages unless connected to the server")
 
-        # Read magic bytes + type byte
-        msgBytes = self.socket.recv(len(Protocol.MAGIC) + 1)
-        lengthBytes = Protocol.getPayloadLengthBytesCount(msgBytes)
-
-        # Read payload size
-        msgBytes += self.socket.recv(lengthBytes)
-        payloadLength = Protocol.getPayloadLength(msgBytes)
-
-        # Read payload
-        msgBytes += self.socket.recv(payloadLength)
+        # Listeners may keep the message, so it is copied out of the receive buffer once
+        msgBytes = bytes(self.reader.readFrame())
 
         self._onReceive(msgBytes)
 
@@ -134,17 +225,19 @@ class Client:
         for listener in self.sendListeners:
             listener.onMessage(msgBytes)
 
-    def reconnect(self, host: str, port: int) -> None:
+    def reconnect(self, host: str, port: int) -> bool:
         """
         Tries to reconnect to the server with the new host and port
         Args:
             host: the new host
             port: the new port
+        Returns:
+            `True` if the connection was successful, `False` otherwise
         """
         self.disconnect()
         self.host = host
         self.port = port
-        self.connect()
+        return self.connect()
 
 
 class MessageListener:
@@ -0,0 +1,152 @@
+import queue
+import select
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Iterator
+
+from ansi import ANSI
+from client.client import Client, NotConnectedError
+from config import Config
+from logger import Logger
+
+
+class ClientPool:
+    """
+    Pool of connected clients, leased to concurrent tasks one at a time
+
+    Each leased client is health-checked first and reconnected with an
+    exponential backoff if the server closed the connection
+    """
+
+    def __init__(self,
+                 size: int = 4,
+                 host: Optional[str] = None,
+                 port: Optional[int] = None,
+                 maxRetries: int = 5,
+                 backoff: float = 0.5,
+                 maxBackoff: float = 10.0) -> None:
+        self.host: str = Config.HOST if host is None else host
+        self.port: int = Config.PORT if port is None else port
+        self.maxRetries: int = maxRetries
+        self.backoff: float = backoff
+        self.maxBackoff: float = maxBackoff
+        self.logger = Logger("ClientPool", styles={
+            "info": [],
+            "error": [ANSI.RED, ANSI.BOLD],
+            "warning": [ANSI.YELLOW, ANSI.ITALIC],
+            "success": [ANSI.LGREEN, ANSI.ITALIC]
+        })
+
+        self.clients: list[Client] = [Client(self.host, self.port) for _ in range(size)]
+        self.idle: queue.Queue[Client] = queue.Queue()
+        self.lock: threading.Lock = threading.Lock()
+        self.closed: bool = False
+
+        for client in self.clients:
+            self._reconnect(client)
+            self.idle.put(client)
+
+    def __enter__(self) -> "ClientPool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def size(self) -> int:
+        return len(self.clients)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[Client]:
+        """
+        Leases a connected client for the duration of a `with` block
+
+        If the block raises, the client is reconnected before going back to the
+        pool, since its session may be left in the middle of a dialogue
+        Args:
+            timeout: maximum time to wait for an idle client. If None, waits indefinitely
+        Returns:
+            a context manager yielding the leased client
+        Raises:
+            queue.Empty: if no client became available before the timeout
+            NotConnectedError: if the pool is closed or the client could not reconnect
+        """
+
+        if self.closed:
+            raise NotConnectedError("Cannot lease a client from a closed pool")
+
+        client = self.idle.get(timeout=timeout)
+        healthy = True
+
+        try:
+            if not self.isHealthy(client):
+                self.logger.warn("Connection lost or holding stale messages, reconnecting")
+                self._reconnect(client)
+
+            yield client
+
+        except BaseException:
+            healthy = False
+            raise
+
+        finally:
+            if not healthy:
+                client.disconnect()
+
+            self.idle.put(client)
+
+    def isHealthy(self, client: Client) -> bool:
+        """
+        Checks whether a client is still connected to the server, with no unread data
+
+        An idle client should not have anything to read. Pending data (a
+        broadcast, or the leftover reply of an interrupted task) would be read
+        by the next task as its own response, so a client with data in its
+        reader's buffer or in the socket is considered unhealthy, like a
+        connection closed or reset by the server
+        Args:
+            client: the client to check
+        Returns:
+            `True` if the client is usable, `False` otherwise
+        """
+
+        if client.socket is None or client.reader is None or client.reader.pending != 0:
+            return False
+
+        try:
+            readable, _, _ = select.select([client.socket], [], [], 0)
+
+        except (OSError, ValueError):
+            return False
+
+        return not readable
+
+    def close(self) -> None:
+        """
+        Disconnects every client of the pool
+        """
+
+        with self.lock:
+            self.closed = True
+            for client in self.clients:
+                client.disconnect()
+
+    def _reconnect(self, client: Client) -> None:
+        """
+        Reconnects a client, waiting longer after each failed attempt
+        Args:
+            client: the client to reconnect
+        Raises:
+            NotConnectedError: if every attempt failed
+        """
+
+        for attempt in range(self.maxRetries):
+            if client.reconnect(self.host, self.port):
+                return
+
+            delay = min(self.backoff * 2 ** attempt, self.maxBackoff)
+            self.logger.warn(f"Connection attempt {attempt + 1}/{self.maxRetries} failed, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+        raise NotConnectedError(f"Could not connect to {self.host}:{self.port}")
@@ -1,4 +1,6 @@
-from typing import Union
+import sys
+from array import array
+from typing import Union, Iterable
 
 from PIL import Image
 
@@ -16,6 +18,7 @@ class Protocol:
     SERVER = b"s"
 
     BYTE_SIZE = 4
+    _ARRAY_TYPECODE = "I"
     MAX_IMAGE_WIDTH = 128
     MAX_IMAGE_HEIGHT = 128
 
@@ -113,6 +116,10 @@ class Protocol:
     def encodeTextPayload(payload: str) -> bytes:
         """
         Encodes a text message into bytes using the correct format
+
+        The whole message is written at once into a preallocated buffer: pure
+        ASCII messages are copied into the last byte of each slot with a single
+        slice assignment, other messages are packed from their int values
         Args:
             payload: the text message to encode
 
@@ -120,15 +127,16 @@ class Protocol:
             the encoded message bytes (only contains length and message)
         """
 
-        byteList = []
+        length = len(payload)
+        payloadBytes = bytearray(2 + length * Protocol.BYTE_SIZE)
+        payloadBytes[:2] = length.to_bytes(2, "big")
 
-        byteList += len(payload).to_bytes(2, "big")
+        if payload.isascii():
+            payloadBytes[1 + Protocol.BYTE_SIZE::Protocol.BYTE_SIZE] = payload.encode("ascii")
+        else:
+            payloadBytes[2:] = Protocol.packInts(Protocol.textToInts(payload))
 
-        for char in payload:
-            charBytes = char.encode("utf-8").rjust(Protocol.BYTE_SIZE, b"\0")
-            byteList += charBytes
-
-        return bytes(byteList)
+        return bytes(payloadBytes)
 
     @staticmethod
     def encodeImagePayload(payload: Image.Image) -> bytes:
@@ -193,6 +201,9 @@ class Protocol:
     def decodeTextPayload(payloadBytes: bytes) -> str:
         """
         Decodes bytes as a text payload
+
+        Pure ASCII messages are extracted with a single strided slice, other
+        messages are unpacked as ints and each distinct value is converted once
         Args:
             payloadBytes: the encoded payload bytes
 
@@ -201,13 +212,19 @@ class Protocol:
         """
 
         length = int.from_bytes(payloadBytes[:2], "big")
-        textBytes = []
-        for i in range(length):
-            pos = 2 + i * Protocol.BYTE_SIZE
-            charBytes = payloadBytes[pos:pos + Protocol.BYTE_SIZE].lstrip(b"\0")
-            textBytes += charBytes
+        slots = bytes(payloadBytes[2:2 + length * Protocol.BYTE_SIZE])
+
+        # Truncated payload: the missing slots are empty and the last partial slot is zero-padded
+        partial = len(slots) % Protocol.BYTE_SIZE
+        if partial != 0:
+            slots = slots[:-partial] + slots[-partial:].rjust(Protocol.BYTE_SIZE, b"\0")
 
-        return bytes(textBytes).decode("utf-8")
+        count = len(slots) // Protocol.BYTE_SIZE
+        lastBytes = slots[Protocol.BYTE_SIZE - 1::Protocol.BYTE_SIZE]
+        if lastBytes.isascii() and 0 not in lastBytes and slots.count(0) == len(slots) - count:
+            return lastBytes.decode("ascii")
+
+        return Protocol.intsToText(Protocol.groupBytesIntoInt(slots))
 
     @staticmethod
     def decodeImagePayload(payloadBytes: bytes) -> Image.Image:
@@ -247,6 +264,13 @@ class Protocol:
             the array of ints
         """
 
+        if len(payloadBytes) % Protocol.BYTE_SIZE == 0 and Protocol._canUseIntArray():
+            ints = array(Protocol._ARRAY_TYPECODE)
+            ints.frombytes(payloadBytes)
+            if sys.byteorder == "little":
+                ints.byteswap()
+            return ints.tolist()
+
         ints = []
         for i in range(0, len(payloadBytes), Protocol.BYTE_SIZE):
             value = int.from_bytes(payloadBytes[i:i + Protocol.BYTE_SIZE], "big")
@@ -254,6 +278,92 @@ class Protocol:
 
         return ints
 
+    @staticmethod
+    def packInts(values: Iterable[int]) -> bytes:
+        """
+        Converts ints into their concatenated padded-bytes representation in one pass
+        Args:
+            values: the ints to convert
+
+        Returns:
+            the padded bytes of all values
+        Raises:
+            OverflowError: if a value is negative or does not fit in `BYTE_SIZE` bytes
+        """
+
+        if not Protocol._canUseIntArray():
+            return b"".join(Protocol.intToPaddedBytes(value) for value in values)
+
+        ints = array(Protocol._ARRAY_TYPECODE, values)
+        if sys.byteorder == "little":
+            ints.byteswap()
+
+        return ints.tobytes()
+
+    @staticmethod
+    def textToInts(text: str) -> list[int]:
+        """
+        Converts every character of a text into its int value (see `charToInt`)
+        Args:
+            text: the text to convert
+
+        Returns:
+            the list of int values, one per character
+        """
+
+        if text.isascii():
+            return list(text.encode("ascii"))
+
+        values = {char: Protocol.charToInt(char) for char in set(text)}
+        return list(map(values.__getitem__, text))
+
+    @staticmethod
+    def intsToText(values: list[int]) -> str:
+        """
+        Converts int values back into a text (inverse of `textToInts`), each distinct value being converted once
+        Args:
+            values: the int values, one per character
+
+        Returns:
+            the text
+        Raises:
+            UnicodeDecodeError: if a value is not the UTF-8 encoding of a character
+        """
+
+        charBytes = {
+            value: value.to_bytes((value.bit_length() + 7) // 8, "big")
+            for value in set(values)
+        }
+
+        return b"".join(map(charBytes.__getitem__, values)).decode("utf-8")
+
+    @staticmethod
+    def symbolsToText(values: list[int]) -> str:
+        """
+        Converts decrypted symbol values back into a text, each distinct value being converted once
+
+        Unlike `intsToText`, where an all-zero slot is padding and produces no
+        character, every value is a symbol here, so 0 decodes to NUL
+        Args:
+            values: the int values, one per character
+
+        Returns:
+            the text
+        Raises:
+            UnicodeDecodeError: if a value is not the UTF-8 encoding of a character
+        """
+
+        charBytes = {
+            value: value.to_bytes(max(1, (value.bit_length() + 7) // 8), "big")
+            for value in set(values)
+        }
+
+        return b"".join(map(charBytes.__getitem__, values)).decode("utf-8")
+
+    @staticmethod
+    def _canUseIntArray() -> bool:
+        return array(Protocol._ARRAY_TYPECODE).itemsize == Protocol.BYTE_SIZE
+
     @staticmethod
     def intToPaddedBytes(value: int) -> bytes:
         """
@@ -285,3 +395,4 @@ class Protocol:
     def getMessageType(messageBytes: bytes) -> bytes:
         magicLen = len(Protocol.MAGIC)
         return messageBytes[magicLen:magicLen+1]
+
@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+from typing import NamedTuple
+
+from math_utils.exponentiation import FixedBaseTable
+from math_utils.primes import getRandomSafePrime, isPrime
+from utils import getRootPath
+
+
+class DHGroup(NamedTuple):
+    """Diffie-Hellman group: a safe prime p = 2q + 1 and a generator g of the multiplicative group mod p"""
+
+    p: int
+    g: int
+
+    @property
+    def q(self) -> int:
+        return (self.p - 1) // 2
+
+    @property
+    def bits(self) -> int:
+        return self.p.bit_length()
+
+
+class DHGroups:
+    """
+    Generates, validates and caches Diffie-Hellman groups
+
+    Groups are kept in memory and saved on disk by size, so that handshakes
+    only generate a group the first time a size is used
+    """
+
+    DEFAULT_BITS = 64
+    _path = os.path.join(getRootPath(), "cache", "dh_groups.json")
+    _groups: dict[int, DHGroup] = {}
+    _tables: dict[DHGroup, FixedBaseTable] = {}
+    _lock = threading.Lock()
+    _loaded = False
+
+    @staticmethod
+    def get(bits: int = DEFAULT_BITS) -> DHGroup:
+        """
+        Returns the cached group of the given size, generating it if needed
+        Args:
+            bits: the bit length of the prime p
+        Returns:
+            the group
+        """
+
+        with DHGroups._lock:
+            DHGroups._load()
+
+            group = DHGroups._groups.get(bits)
+            if group is None:
+                group = DHGroups.generate(bits)
+                DHGroups._groups[bits] = group
+                DHGroups._save()
+
+            return group
+
+    @staticmethod
+    def getGeneratorTable(group: DHGroup) -> FixedBaseTable:
+        """
+        Returns the (cached) table of precomputed powers of a group's generator
+        Args:
+            group: the group
+        Returns:
+            the fixed-base table of g modulo p
+        """
+
+        with DHGroups._lock:
+            table = DHGroups._tables.get(group)
+            if table is None:
+                table = FixedBaseTable(group.g, group.p, group.bits)
+                DHGroups._tables[group] = table
+
+            return table
+
+    @staticmethod
+    def generate(bits: int) -> DHGroup:
+        """
+        Generates a new group from a random safe prime
+        Args:
+            bits: the bit length of the prime p (>= 3)
+        Returns:
+            the group
+        """
+
+        p = getRandomSafePrime(bits)
+        return DHGroup(p, DHGroups.findGenerator(p))
+
+    @staticmethod
+    def findGenerator(p: int) -> int:
+        """
+        Finds the smallest generator of the multiplicative group modulo a safe prime
+
+        Since p - 1 = 2q, g is a generator if and only if g^2 != 1 and g^q != 1
+        Args:
+            p: the safe prime
+        Returns:
+            the smallest generator
+        """
+
+        q = (p - 1) // 2
+        for g in range(2, p):
+            if DHGroups.isGenerator(p, q, g):
+                return g
+
+        raise ValueError(f"{p} is not a safe prime")
+
+    @staticmethod
+    def isGenerator(p: int, q: int, g: int) -> bool:
+        return pow(g, 2, p) != 1 and pow(g, q, p) != 1
+
+    @staticmethod
+    def validate(group: DHGroup) -> bool:
+        """
+        Checks that p is a safe prime and g one of its generators
+        Args:
+            group: the group to check
+        Returns:
+            True if the group is valid, False otherwise
+        """
+
+        p, g = group
+        q = (p - 1) // 2
+
+        return p > 3 and 1 < g < p and isPrime(p) and isPrime(q) and DHGroups.isGenerator(p, q, g)
+
+    @staticmethod
+    def _load() -> None:
+        if DHGroups._loaded:
+            return
+
+        DHGroups._loaded = True
+        if not os.path.isfile(DHGroups._path):
+            return
+
+        with open(DHGroups._path, "r") as f:
+            groups = json.load(f)
+
+        # Groups read from disk are validated once before being trusted
+        for group in groups:
+            group = DHGroup(int(group["p"]), int(group["g"]))
+            if DHGroups.validate(group):
+                DHGroups._groups.setdefault(group.bits, group)
+
+    @staticmethod
+    def _save() -> None:
+        os.makedirs(os.path.dirname(DHGroups._path), exist_ok=True)
+
+        with open(DHGroups._path, "w") as f:
+            json.dump([
+                {"p": str(group.p), "g": str(group.g)}
+                for bits, group in sorted(DHGroups._groups.items())
+            ], f, indent=4)
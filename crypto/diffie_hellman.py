@@ -1,45 +1,68 @@
 import random
+from typing import Optional
 
-from math_utils.primes import getLargestPrime, getPrimeFactors
+from crypto.dh_groups import DHGroup, DHGroups
+from crypto.key_pool import KeyPool
 from math_utils.ring import Ring
 
 
 class DiffieHellman:
     NAME = "DifHel"
 
-    def __init__(self):
-        self.p = getLargestPrime(random.randint(2, 5000))
+    # Pre-generated (a, g^a) pairs of each group, see `createKeyPool`
+    keyPools: dict[DHGroup, KeyPool[tuple[int, int]]] = {}
+
+    def __init__(self, bits: int = DHGroups.DEFAULT_BITS, group: Optional[DHGroup] = None):
+        if group is None:
+            group = DHGroups.get(bits)
+
+        self.group: DHGroup = group
+        self.p = group.p
         print(f"p = {self.p}")
         self.ring = Ring(self.p)
 
-        self.prime_factor_list = set(getPrimeFactors(self.p - 1))
-        print(f"prime factors = {self.prime_factor_list}")
-
-        self.g = self.find_generator()
+        self.g = group.g
         print(f"g = {self.g}")
 
-        self.a = random.randint(2, 5000)
+        keyPool = DiffieHellman.keyPools.get(group)
+        if keyPool is not None:
+            self.a, self.gA = keyPool.get()
+        else:
+            self.a, self.gA = DiffieHellman.generateHalfKey(group)
         print(f"a = {self.a}")
 
-        self.gA = self.ring.fastPow(self.g, self.a)
-
     def compute_secret(self, gB: int) -> int:
         return self.ring.fastPow(gB, self.a)
 
-    def find_generator(self):
-        for g in range(2, self.p):
-            if self.check_valid_generator(g):
-                return g
-
-    def check_valid_generator(self, g) -> bool:
-        check = False
-        for f in self.prime_factor_list:
-            a = (self.p - 1) // f
-            if self.ring.fastPow(g, a) == 1:
-                return False
-            else:
-                check = True
-        return check
+    @staticmethod
+    def generateHalfKey(group: DHGroup) -> tuple[int, int]:
+        """
+        Generates a private exponent and the corresponding half key
+        Args:
+            group: the group to use
+        Returns:
+            a tuple containing the private exponent a and g^a
+        """
+
+        a = random.randint(2, group.p - 2)
+        return (a, DHGroups.getGeneratorTable(group).pow(a))
+
+    @staticmethod
+    def createKeyPool(bits: int = DHGroups.DEFAULT_BITS, **kwargs) -> KeyPool[tuple[int, int]]:
+        """
+        Creates and starts a pool of pre-generated half keys for the cached group of the given size
+        Args:
+            bits: the bit length of the group's prime
+            **kwargs: the options of the pool (capacity, low-water mark, refill rate, persistence path)
+        Returns:
+            the started key pool
+        """
+
+        group = DHGroups.get(bits)
+        keyPool = KeyPool(lambda: DiffieHellman.generateHalfKey(group), **kwargs).start()
+        DiffieHellman.keyPools[group] = keyPool
+
+        return keyPool
 
 
 if __name__ == '__main__':
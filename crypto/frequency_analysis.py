@@ -1,16 +1,26 @@
-import json
-import os
+import math
+import operator
+from collections import Counter
+from typing import Callable, Iterable, Optional
 
 from client.protocol import Protocol
 from crypto.algorithm import Algorithm
+from crypto.frequency_model import FrequencyModel
+from crypto.language_registry import LanguageRegistry
 from crypto.shift_encryption import ShiftEncryption
-from utils import getRootPath, formatException
 
 
-def sortingCriterion(pair: tuple[str, float]) -> float:
-    return pair[1]
-
 class FrequencyAnalysis(Algorithm):
+    """
+    Breaks shift ciphers by comparing symbol frequencies with a reference distribution
+
+    Every candidate key is scored at once from a single histogram of the
+    ciphertext, without decoding it
+    """
+
+    # Expected frequency of the symbols missing from the reference distribution
+    UNKNOWN_FREQUENCY = 1e-5
+
     def letter_counter(self, ciphertext: list[int]) -> dict:
         counts = {}
         frequencies = {}
@@ -24,89 +34,237 @@ class FrequencyAnalysis(Algorithm):
             frequencies[char] = count / total
         return frequencies
 
-    def compare(self, ciphertextBytes: bytes, dictFrequency: dict) -> int:
-        ciphertextInts = Protocol.groupBytesIntoInt(ciphertextBytes)
-
-        cipher_frequency = self.letter_counter(ciphertextInts)
-        charFrequencyPairs = cipher_frequency.items()
-        charFrequencyPairs = sorted(charFrequencyPairs, key = sortingCriterion, reverse = True)
-        print(charFrequencyPairs)
-        dictFrequencyPairs = dictFrequency.items()
-        dictFrequencyPairs = sorted(dictFrequencyPairs, key=sortingCriterion, reverse=True)
-        print(dictFrequencyPairs)
-
-        # Comparing first letter
-
-        bestKey = None
-        bestAverage = None
-
-        # For each encrypted letter
-        for j in range(len(charFrequencyPairs)):
-            cipherLetterValue = charFrequencyPairs[j][0]
-
-            # For each letter in dictionary
-            for i in range(len(dictFrequencyPairs)):
-                plainLetterValue = int.from_bytes(dictFrequencyPairs[i][0].encode("UTF-8"), "big")
-                key = cipherLetterValue - plainLetterValue
-                if key < 0:
-                    continue
-                print(f"Trying key {key}")
-
-                try:
-                    decoder = ShiftEncryption(key)
-                    decodedMessage = decoder.decode(ciphertextBytes)
-                    new_cipher_frequency = self.mapFrequencies(cipher_frequency, ciphertextInts, decodedMessage)
-
-                    average = self.get_average_diff(new_cipher_frequency, dictFrequency)
-                    if bestAverage is None or average < bestAverage:
-                        bestAverage = average
-                        bestKey = key
-
-                except Exception as e:
-                    if key == 1:
-                        print(formatException(e))
-
-        print(f"Best key: {bestKey}")
-        print(f"Best average: {bestAverage}")
-        return bestKey
-
-    def mapFrequencies(self, charFrequencies: dict[int, float], ciphertext: list[int], decodedMessage: str) -> dict[str, float]:
-        newFrequencies = {}
-
-        for i in range(len(ciphertext)):
-            encrypted_letter = ciphertext[i]
-            decrypted_letter = decodedMessage[i]
-            frequency = charFrequencies[encrypted_letter]
-            newFrequencies[decrypted_letter] = frequency
-
-        return newFrequencies
-
-    def get_average_diff(self, cipher_frequencies: dict[str, float], dict_frequencies: dict[str, float]) -> float:
-        total = 0
-        count = 0
-
-        for i in cipher_frequencies.keys():
-            if i in dict_frequencies:
-                frequencyA = cipher_frequencies[i]
-                frequencyB = dict_frequencies[i]
-                diff = abs(frequencyA - frequencyB) / frequencyB
-                total += diff
-                count += 1
-
-        average = total / count
-        print(average)
-        return average
+    @staticmethod
+    def loadReference(language: str = "francais") -> dict[int, float]:
+        """
+        Loads the reference distribution of a language from its (cached) frequency model
+        Args:
+            language: the name of the language, as in `res/<language>_freq.bin`
+        Returns:
+            the normalized frequency of each symbol value (see `getReference`)
+        """
 
-if __name__ == '__main__':
-    dictPath = os.path.join(getRootPath(), "res", "francais_freq.json")
-    file = open(dictPath, "r")
+        return FrequencyModel.load(language).getReference()
+
+    @staticmethod
+    def getReference(dictFrequency: dict[str, float]) -> dict[int, float]:
+        """
+        Converts a reference distribution to symbol values and normalizes it
+        Args:
+            dictFrequency: the frequency of each character
+        Returns:
+            the frequency of each symbol value (see `Protocol.charToInt`), summing to 1
+        """
+
+        total = sum(dictFrequency.values())
+        return {
+            Protocol.charToInt(char): frequency / total
+            for char, frequency in dictFrequency.items()
+        }
+
+    @staticmethod
+    def isShiftKey(key: int) -> bool:
+        """
+        Checks that a key is a valid shift key: non-negative and fitting in a slot
+        Args:
+            key: the key to check
+        Returns:
+            True if the key is valid, False otherwise
+        """
+
+        return 0 <= key < 1 << (8 * Protocol.BYTE_SIZE)
+
+    @staticmethod
+    def rankKeys(histogram: dict[int, int],
+                 reference: dict[int, float],
+                 getKey: Callable[[int, int], int] = operator.sub,
+                 isValidKey: Optional[Callable[[int], bool]] = None) -> list[tuple[int, float]]:
+        """
+        Scores every shift key against a reference distribution
+
+        The score of a key is the chi-squared distance between the histogram
+        shifted by the key and the expected counts. It is expanded as
+        sum(O^2 / E) - 2 * sum(O) + sum(E), so each (cipher symbol, reference
+        symbol) pair only adds its contribution to the key it implies, in
+        O(cipher symbols * reference symbols) whatever the text length.
+        Keys outside the cipher's valid range, or not mapping any symbol onto
+        the reference, are not ranked
+        Args:
+            histogram: the number of occurrences of each ciphertext symbol value
+            reference: the expected frequency of each plaintext symbol value (see `getReference`)
+            getKey: the function giving the key which encrypts a plaintext value (second argument)
+                into a ciphertext value (first argument). Defaults to a subtraction, for shift ciphers
+            isValidKey: the function telling whether a key can be used by the cipher.
+                If None, keys must be shift keys (see `isShiftKey`)
+        Returns:
+            the (key, score) pairs, from the most to the least likely key (lowest score first)
+        """
+
+        total = sum(histogram.values())
+        if total == 0:
+            return []
+
+        if isValidKey is None:
+            isValidKey = FrequencyAnalysis.isShiftKey
+
+        # For each key: sum(O^2 / E), sum(O), sum(O^2) and number of symbols, over matched symbols
+        sums: dict[int, list] = {}
+        invalidKeys: set[int] = set()
+
+        for value, count in histogram.items():
+            countSquared = count * count
+            for plainValue, frequency in reference.items():
+                key = getKey(value, plainValue)
+                keySums = sums.get(key)
+                if keySums is None:
+                    if key in invalidKeys:
+                        continue
+
+                    if not isValidKey(key):
+                        invalidKeys.add(key)
+                        continue
+
+                    keySums = sums[key] = [0.0, 0, 0, 0]
+
+                keySums[0] += countSquared / (total * frequency)
+                keySums[1] += count
+                keySums[2] += countSquared
+                keySums[3] += 1
+
+        squaresTotal = sum(count * count for count in histogram.values())
+        symbolsCount = len(histogram)
+        unknownExpected = total * FrequencyAnalysis.UNKNOWN_FREQUENCY
+
+        scores = []
+        for key, (matchedScore, matchedCount, matchedSquares, matchedSymbols) in sums.items():
+            # Symbols shifted outside the reference are compared to a tiny expected count
+            unmatchedScore = (
+                (squaresTotal - matchedSquares) / unknownExpected
+                - 2 * (total - matchedCount)
+                + (symbolsCount - matchedSymbols) * unknownExpected
+            )
+            score = matchedScore - 2 * matchedCount + total + unmatchedScore
+            scores.append((key, score))
+
+        scores.sort(key=lambda pair: pair[1])
+        return scores
+
+    def compare(self, ciphertextBytes: bytes, dictFrequency: Optional[dict] = None) -> int:
+        """
+        Finds the most likely key of a shift-encrypted message
+        Args:
+            ciphertextBytes: the encrypted message
+            dictFrequency: the reference frequency of each character. If None, the language is detected (see `crack`)
+        Returns:
+            the best key, or None if no key could be scored with the given dictionary
+        Raises:
+            ValueError: if the language is detected and there is no language or no valid key
+        """
 
-    dictFrequency = json.load(file)
+        if dictFrequency is None:
+            return self.crack(ciphertextBytes)[0]
 
-    file.close()
+        histogram = Counter(Protocol.groupBytesIntoInt(ciphertextBytes))
+        ranking = self.rankKeys(histogram, self.getReference(dictFrequency))
+
+        if len(ranking) == 0:
+            return None
+
+        return ranking[0][0]
+
+    @staticmethod
+    def crack(ciphertextBytes: bytes, languages: Optional[Iterable[str]] = None) -> tuple[int, str]:
+        """
+        Finds the most likely key and language of a shift-encrypted message
+
+        The best key of each language is found with `rankKeys`, then the
+        language whose model best explains the corresponding decryption wins
+        Args:
+            ciphertextBytes: the encrypted message
+            languages: the languages to consider. If None, uses all available languages
+        Returns:
+            the best key and its language
+        Raises:
+            ValueError: if there is no language to consider or no valid key
+        """
+
+        if languages is None:
+            languages = LanguageRegistry.getLanguages()
+
+        languages = tuple(languages)
+        result = FrequencyAnalysis.crackColumn(Protocol.groupBytesIntoInt(ciphertextBytes), languages)
+        language, keys = FrequencyAnalysis.chooseLanguage([result], languages)
+
+        return keys[0], language
+
+    @staticmethod
+    def crackColumn(column: list[int],
+                    languages: tuple[str, ...],
+                    getKey: Callable[[int, int], int] = operator.sub,
+                    isValidKey: Optional[Callable[[int], bool]] = None) -> list[tuple[Optional[int], float]]:
+        """
+        Finds the most likely key of a column of symbols encrypted with the same key, in each language
+
+        Models are loaded from the process' own (memory-mapped) cache, so only
+        the language names need to be sent to worker processes
+        Args:
+            column: the ciphertext symbol values
+            languages: the candidate languages
+            getKey: the function giving the key from a ciphertext and a plaintext value (see `rankKeys`).
+                It must also decrypt a ciphertext value (first argument) with a key (second argument),
+                as a subtraction or a XOR do
+            isValidKey: the function telling whether a key can be used by the cipher (see `rankKeys`)
+        Returns:
+            for each language, the best key and the negative log-likelihood of the column
+            decrypted with it. If no key is valid, the key is None and the loss infinite
+        """
+
+        histogram = Counter(column)
+        results = []
+
+        for language in languages:
+            ranking = FrequencyAnalysis.rankKeys(histogram, LanguageRegistry.getReference(language), getKey, isValidKey)
+            if len(ranking) == 0:
+                results.append((None, math.inf))
+                continue
+
+            key = ranking[0][0]
+            decrypted = {getKey(value, key): count for value, count in histogram.items()}
+            results.append((key, LanguageRegistry.getLoss(decrypted, language)))
+
+        return results
+
+    @staticmethod
+    def chooseLanguage(results: list[list[tuple[Optional[int], float]]],
+                       languages: tuple[str, ...]) -> tuple[str, list[int]]:
+        """
+        Chooses the language best explaining the decryption of all the columns of a message
+        Args:
+            results: the result of `crackColumn` for each column
+            languages: the candidate languages, in the same order as the results of each column
+        Returns:
+            the language and the key of each column in that language
+        Raises:
+            ValueError: if there is no language to choose from or no valid key in any language
+        """
+
+        if len(languages) == 0:
+            raise ValueError("No language model is available")
+
+        # The losses of the columns add up to the loss of the whole decryption
+        losses = [sum(result[i][1] for result in results) for i in range(len(languages))]
+        best = min(range(len(languages)), key=losses.__getitem__)
+
+        if math.isinf(losses[best]):
+            raise ValueError("No valid key decrypts the ciphertext")
+
+        return languages[best], [result[best][0] for result in results]
+
+
+if __name__ == '__main__':
+    import time
 
     encrypter = ShiftEncryption(1)
-    rawText = "banana"
     rawText = """La taille des selles animales varie fortement suivant la corpulence de l'animal.
 
 Celles des lapins font generalement 1,2 cm de diametre et sont seches au toucher.
@@ -114,10 +272,13 @@ Celles des lapins font generalement 1,2 cm de diametre et sont seches au toucher
 Les fientes aviaires resultent d'un melange d'urine et de feces au niveau du cloaque, sont liees a l'absence de vessie urinaire chez les oiseaux, laquelle peut etre interpretee comme une adaptation au vol (en) (les organes les plus lourds etant rassembles au centre du corps). Elles sont composees d'urine liquide tres concentree (economie d'eau, adaptation a la conquete des airs), d'acides uriques (precipitant sous forme d'urates, sels d'acide urique qui protegent les tubules renaux de la cristallisation de ces acides) et de feces."""
     ciphertext = encrypter.encode(rawText)
 
-    test = FrequencyAnalysis()
-    test.letter_counter("banana")
+    start = time.perf_counter()
+    histogram = Counter(Protocol.groupBytesIntoInt(ciphertext))
+    ranking = FrequencyAnalysis.rankKeys(histogram, FrequencyAnalysis.loadReference())
+    print(f"Ranked {len(ranking)} keys in {(time.perf_counter() - start) * 1000:.2f}ms")
+    print(f"Top keys: {ranking[:5]}")
 
-    key = test.compare(ciphertext, dictFrequency)
+    key = FrequencyAnalysis().compare(ciphertext)
     decoder = ShiftEncryption(key)
     decodedMessage = decoder.decode(ciphertext)
-    print(f"Decoded as: {decodedMessage}")
\ No newline at end of file
+    print(f"Decoded as: {decodedMessage}")
@@ -0,0 +1,272 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Optional, Union
+
+from client.protocol import Protocol
+from utils import getRootPath
+
+
+class FrequencyModel:
+    """
+    Reference frequency model of a language, stored in a compact binary file
+
+    The file starts with a header (magic, version, number of sections) and a
+    table of sections. Each section holds the n-grams of one size, as sorted
+    symbol values (n uint32 per n-gram, see `Protocol.charToInt`), and their
+    frequencies (float64). Everything is little-endian and aligned on 8 bytes,
+    so the file is memory-mapped and used without being parsed, and its pages
+    are shared by all the processes loading it
+    """
+
+    MAGIC = b"ISCF"
+    VERSION = 1
+    EXTENSION = ".bin"
+
+    _HEADER = struct.Struct("<4sHH")
+    # n-gram size, number of n-grams, offset of the symbol values, offset of the frequencies
+    _SECTION = struct.Struct("<IIQQ")
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap]) -> None:
+        """
+        Args:
+            buffer: the content of a model file
+        Raises:
+            ValueError: if the buffer is not a valid model
+        """
+
+        self.buffer: memoryview = memoryview(buffer)
+        self.sections: dict[int, tuple[memoryview, memoryview]] = {}
+        self._reference: Optional[dict[int, float]] = None
+
+        if len(self.buffer) < self._HEADER.size:
+            raise ValueError("Truncated frequency model")
+
+        magic, version, sectionsCount = self._HEADER.unpack_from(self.buffer)
+        if magic != self.MAGIC:
+            raise ValueError(f"Frequency models must start with {self.MAGIC} (not {magic})")
+
+        if version != self.VERSION:
+            raise ValueError(f"Unsupported frequency model version {version}")
+
+        for i in range(sectionsCount):
+            n, count, valuesOffset, frequenciesOffset = self._SECTION.unpack_from(
+                self.buffer, self._HEADER.size + i * self._SECTION.size
+            )
+            self.sections[n] = (
+                self._getArray(valuesOffset, count * n, "I"),
+                self._getArray(frequenciesOffset, count, "d")
+            )
+
+        if 1 not in self.sections:
+            raise ValueError("Frequency models must contain the frequency of single characters")
+
+    def _getArray(self, offset: int, length: int, typecode: str) -> memoryview:
+        itemSize = struct.calcsize(typecode)
+        if offset + length * itemSize > len(self.buffer):
+            raise ValueError("Truncated frequency model")
+
+        view = self.buffer[offset:offset + length * itemSize]
+
+        # Big-endian machines get a swapped copy instead of a view of the file
+        if sys.byteorder != "little" or array(typecode).itemsize != itemSize:
+            values = array(typecode)
+            values.frombytes(view)
+            if sys.byteorder != "little":
+                values.byteswap()
+            return memoryview(values)
+
+        return view.cast(typecode)
+
+    @property
+    def values(self) -> memoryview:
+        """The sorted symbol values of the single characters"""
+        return self.sections[1][0]
+
+    @property
+    def frequencies(self) -> memoryview:
+        """The frequency of each single character, in the same order as `values`"""
+        return self.sections[1][1]
+
+    @property
+    def ngramSizes(self) -> list[int]:
+        """The sizes of the n-gram tables (other than single characters)"""
+        return sorted(n for n in self.sections if n != 1)
+
+    def getFrequency(self, value: int) -> float:
+        """
+        Looks up the frequency of a single character
+        Args:
+            value: the symbol value of the character
+        Returns:
+            its frequency, or 0 if it is not part of the model
+        """
+
+        i = bisect_left(self.values, value)
+        if i < len(self.values) and self.values[i] == value:
+            return self.frequencies[i]
+
+        return 0
+
+    def getReference(self) -> dict[int, float]:
+        """
+        Returns the (cached) frequency of each single character
+        Returns:
+            a dictionary mapping symbol values to their frequency
+        """
+
+        if self._reference is None:
+            self._reference = dict(zip(self.values, self.frequencies))
+
+        return self._reference
+
+    def getNgrams(self, n: int) -> dict[tuple[int, ...], float]:
+        """
+        Returns the frequency of each n-gram of the given size
+        Args:
+            n: the n-gram size
+        Returns:
+            a dictionary mapping tuples of symbol values to their frequency (empty if the model has no such table)
+        """
+
+        if n not in self.sections:
+            return {}
+
+        values, frequencies = self.sections[n]
+        return {
+            tuple(values[i * n:(i + 1) * n]): frequency
+            for i, frequency in enumerate(frequencies)
+        }
+
+    @staticmethod
+    def build(frequencies: dict[str, float], ngrams: Optional[dict[int, dict[str, float]]] = None) -> bytes:
+        """
+        Serializes frequency tables into the binary format
+        Args:
+            frequencies: the frequency of each character
+            ngrams: for each n-gram size, the frequency of each n-gram
+        Returns:
+            the content of the model file
+        """
+
+        tables = {1: frequencies}
+        tables.update(ngrams or {})
+
+        sections = []
+        data = bytearray()
+        dataOffset = FrequencyModel._HEADER.size + len(tables) * FrequencyModel._SECTION.size
+
+        for n, table in sorted(tables.items()):
+            total = sum(table.values())
+            entries = sorted(
+                (tuple(map(Protocol.charToInt, ngram)), frequency / total)
+                for ngram, frequency in table.items()
+                if len(ngram) == n
+            )
+
+            values = array("I", [value for key, _ in entries for value in key])
+            frequencyValues = array("d", [frequency for _, frequency in entries])
+            if sys.byteorder != "little":
+                values.byteswap()
+                frequencyValues.byteswap()
+
+            valuesOffset = dataOffset + len(data)
+            data += values.tobytes()
+            data += bytes(-len(data) % 8)
+
+            frequenciesOffset = dataOffset + len(data)
+            data += frequencyValues.tobytes()
+
+            sections.append(FrequencyModel._SECTION.pack(n, len(entries), valuesOffset, frequenciesOffset))
+
+        header = FrequencyModel._HEADER.pack(FrequencyModel.MAGIC, FrequencyModel.VERSION, len(sections))
+        return header + b"".join(sections) + bytes(data)
+
+    @staticmethod
+    def convert(jsonPath: str, outPath: Optional[str] = None) -> str:
+        """
+        Converts a JSON frequency table (and its n-gram tables, if any) to a model file
+
+        The n-gram tables are read from `<name>_ngrams.json` next to `<name>_freq.json`
+        Args:
+            jsonPath: the path of the `<name>_freq.json` file
+            outPath: the path of the model file. If None, the JSON extension is replaced by `EXTENSION`
+        Returns:
+            the path of the model file
+        """
+
+        with open(jsonPath, "r", encoding="utf-8") as f:
+            frequencies = json.load(f)
+
+        ngrams = {}
+        basePath = os.path.splitext(jsonPath)[0]
+        ngramsPath = basePath.removesuffix("_freq") + "_ngrams.json"
+        if os.path.isfile(ngramsPath):
+            with open(ngramsPath, "r", encoding="utf-8") as f:
+                ngrams = {int(n): table for n, table in json.load(f).items()}
+
+        if outPath is None:
+            outPath = basePath + FrequencyModel.EXTENSION
+
+        with open(outPath, "wb") as f:
+            f.write(FrequencyModel.build(frequencies, ngrams))
+
+        return outPath
+
+    @staticmethod
+    def open(path: str) -> "FrequencyModel":
+        """
+        Memory-maps a model file
+        Args:
+            path: the path of the model file
+        Returns:
+            the model
+        Raises:
+            ValueError: if the file is not a valid model
+        """
+
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError(f"Empty frequency model {path}")
+
+            return FrequencyModel(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def load(language: str = "francais") -> "FrequencyModel":
+        """
+        Returns the model of a language, loaded once per process
+
+        If the compiled model `res/<language>_freq.bin` does not exist, it is
+        built in memory from `res/<language>_freq.json`
+        Args:
+            language: the name of the language
+        Returns:
+            the model
+        """
+
+        basePath = os.path.join(getRootPath(), "res", f"{language}_freq")
+
+        if os.path.isfile(basePath + FrequencyModel.EXTENSION):
+            return FrequencyModel.open(basePath + FrequencyModel.EXTENSION)
+
+        with open(basePath + ".json", "r", encoding="utf-8") as f:
+            return FrequencyModel(FrequencyModel.build(json.load(f)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compiles JSON frequency tables into binary frequency models")
+    parser.add_argument("paths", nargs="+", help="<name>_freq.json files")
+    args = parser.parse_args()
+
+    for jsonPath in args.paths:
+        modelPath = FrequencyModel.convert(jsonPath)
+        model = FrequencyModel.open(modelPath)
+        print(f"Saved in {modelPath} ({os.path.getsize(modelPath)} bytes, "
+              f"{len(model.values)} characters, n-grams: {model.ngramSizes})")
@@ -0,0 +1,185 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Generic, Optional, TypeVar, Any
+
+from ansi import ANSI
+from logger import Logger
+from utils import formatException
+
+T = TypeVar("T")
+
+
+class KeyPool(Generic[T]):
+    """
+    Pool of pre-generated key material, refilled by a background thread
+
+    Keys are handed out in O(1) and each key is only handed out once. When the
+    number of available keys drops below the low-water mark, the background
+    thread generates new ones until the pool is full again. If the pool is
+    empty, a key is generated on the spot
+    """
+
+    def __init__(self,
+                 factory: Callable[[], T],
+                 capacity: int = 16,
+                 lowWater: int = 4,
+                 refillRate: Optional[float] = None,
+                 path: Optional[str] = None,
+                 serialize: Callable[[T], Any] = lambda key: key,
+                 deserialize: Callable[[Any], T] = lambda data: data) -> None:
+        """
+        Args:
+            factory: the function generating a new key
+            capacity: the number of keys the pool is refilled up to
+            lowWater: the number of keys below which the pool is refilled
+            refillRate: the maximum number of keys generated per second. If None, there is no limit
+            path: the JSON file in which unused keys are saved by `stop` and loaded by `start`.
+                If None, keys are not persisted
+            serialize: the function converting a key to a JSON-compatible value
+            deserialize: the function converting a JSON value back to a key
+        Raises:
+            ValueError: if the capacity, low-water mark or refill rate is invalid
+        """
+
+        if capacity < 1:
+            raise ValueError(f"Invalid capacity {capacity}, must be at least 1")
+
+        if not 0 <= lowWater <= capacity:
+            raise ValueError(f"Invalid low-water mark {lowWater}, must be between 0 and the capacity ({capacity})")
+
+        if refillRate is not None and not refillRate > 0:
+            raise ValueError(f"Invalid refill rate {refillRate}, must be strictly positive")
+
+        self.factory: Callable[[], T] = factory
+        self.capacity: int = capacity
+        self.lowWater: int = lowWater
+        self.refillRate: Optional[float] = refillRate
+        self.path: Optional[str] = path
+        self.serialize: Callable[[T], Any] = serialize
+        self.deserialize: Callable[[Any], T] = deserialize
+
+        self.keys: deque[T] = deque()
+        self.refillEvent: threading.Event = threading.Event()
+        self.running: bool = False
+        self.thread: Optional[threading.Thread] = None
+        self.logger = Logger("KeyPool", styles={
+            "info": [],
+            "error": [ANSI.RED, ANSI.BOLD],
+            "warning": [ANSI.YELLOW, ANSI.ITALIC],
+            "success": [ANSI.LGREEN, ANSI.ITALIC]
+        })
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __enter__(self) -> "KeyPool[T]":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def start(self) -> "KeyPool[T]":
+        """
+        Loads the persisted keys (if any) and starts the background refill thread
+        Returns:
+            the pool itself
+        """
+
+        if self.running:
+            return self
+
+        self.load()
+        self.running = True
+        self.thread = threading.Thread(target=self._refillLoop, daemon=True)
+        self.thread.start()
+        self.refillEvent.set()
+
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops the background refill thread and persists the unused keys (if a path is set)
+        """
+
+        self.running = False
+        self.refillEvent.set()
+
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+        self.save()
+
+    def get(self) -> T:
+        """
+        Takes a key out of the pool, or generates one if the pool is empty
+        Returns:
+            a key which has never been handed out
+        """
+
+        try:
+            key = self.keys.popleft()
+        except IndexError:
+            key = None
+
+        if len(self.keys) < self.lowWater:
+            self.refillEvent.set()
+
+        if key is None:
+            key = self.factory()
+
+        return key
+
+    def fill(self) -> None:
+        """
+        Generates keys in the current thread until the pool is full
+        """
+
+        while len(self.keys) < self.capacity:
+            self.keys.append(self.factory())
+
+    def load(self) -> None:
+        if self.path is None or not os.path.isfile(self.path):
+            return
+
+        with open(self.path, "r") as f:
+            keys = json.load(f)
+
+        self.keys.extend(self.deserialize(key) for key in keys)
+
+        # Loaded keys must not be handed out again by another process
+        os.remove(self.path)
+
+    def save(self) -> None:
+        if self.path is None or len(self.keys) == 0:
+            return
+
+        folder = os.path.dirname(self.path)
+        if folder != "":
+            os.makedirs(folder, exist_ok=True)
+
+        with open(self.path, "w") as f:
+            json.dump([self.serialize(key) for key in self.keys], f)
+
+    def _refillLoop(self) -> None:
+        while self.running:
+            self.refillEvent.wait()
+            self.refillEvent.clear()
+
+            while self.running and len(self.keys) < self.capacity:
+                start = time.perf_counter()
+
+                try:
+                    self.keys.append(self.factory())
+                except Exception as e:
+                    self.logger.error("An error occurred while generating a key")
+                    self.logger.error(formatException(e))
+                    break
+
+                if self.refillRate is not None:
+                    delay = 1 / self.refillRate - (time.perf_counter() - start)
+                    if delay > 0:
+                        time.sleep(delay)
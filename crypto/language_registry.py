@@ -0,0 +1,133 @@
+import math
+import os
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from client.protocol import Protocol
+from crypto.frequency_model import FrequencyModel
+from utils import getRootPath
+
+
+class LanguageRegistry:
+    """
+    Registry of the language models found in the resources
+
+    A language is available as soon as `res/<language>_freq.bin` (compiled
+    with `crypto.frequency_model`) or `res/<language>_freq.json` (built with
+    `res/frequency_calculator.py`) exists
+    """
+
+    DEFAULT_LANGUAGE = "francais"
+    MODEL_SUFFIX = "_freq"
+    # Frequency given to the symbols missing from a model, so they are unlikely but not impossible
+    FLOOR_FREQUENCY = 1e-5
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def getLanguages() -> tuple[str, ...]:
+        """
+        Lists the available languages (once per process)
+        Returns:
+            the sorted names of the languages
+        """
+
+        languages = set()
+        for filename in os.listdir(os.path.join(getRootPath(), "res")):
+            name, ext = os.path.splitext(filename)
+            if ext in (FrequencyModel.EXTENSION, ".json") and name.endswith(LanguageRegistry.MODEL_SUFFIX):
+                languages.add(name.removesuffix(LanguageRegistry.MODEL_SUFFIX))
+
+        return tuple(sorted(languages))
+
+    @staticmethod
+    def getReference(language: str) -> dict[int, float]:
+        """
+        Returns the frequency of each symbol value of a language
+        Args:
+            language: the name of the language
+        Returns:
+            a dictionary mapping symbol values to their frequency
+        """
+
+        return FrequencyModel.load(language).getReference()
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def getLosses(language: str) -> dict[int, float]:
+        """
+        Returns the (cached) negative log-frequency of each symbol value of a language
+        Args:
+            language: the name of the language
+        Returns:
+            a dictionary mapping symbol values to -log(frequency)
+        """
+
+        return {
+            value: -math.log(max(frequency, LanguageRegistry.FLOOR_FREQUENCY))
+            for value, frequency in LanguageRegistry.getReference(language).items()
+        }
+
+    @staticmethod
+    def getLoss(histogram: dict[int, int], language: str) -> float:
+        """
+        Computes the total negative log-likelihood of a histogram in a language
+        Args:
+            histogram: the number of occurrences of each symbol value
+            language: the name of the language
+        Returns:
+            the sum of -log(frequency) over all symbols, lower is more likely
+        """
+
+        losses = LanguageRegistry.getLosses(language)
+        unknownLoss = -math.log(LanguageRegistry.FLOOR_FREQUENCY)
+
+        return sum(count * losses.get(value, unknownLoss) for value, count in histogram.items())
+
+    @staticmethod
+    def detect(histogram: dict[int, int], languages: Optional[Iterable[str]] = None) -> list[tuple[str, float]]:
+        """
+        Scores a (candidate) plaintext against several language models in a single pass over its histogram
+        Args:
+            histogram: the number of occurrences of each symbol value
+            languages: the languages to consider. If None, uses all available languages
+        Returns:
+            the (language, average negative log-likelihood per symbol) pairs, from the most to the least likely
+        """
+
+        if languages is None:
+            languages = LanguageRegistry.getLanguages()
+
+        languages = list(languages)
+        allLosses = [LanguageRegistry.getLosses(language) for language in languages]
+        unknownLoss = -math.log(LanguageRegistry.FLOOR_FREQUENCY)
+        scores = [0.0] * len(languages)
+
+        for value, count in histogram.items():
+            for i, losses in enumerate(allLosses):
+                scores[i] += count * losses.get(value, unknownLoss)
+
+        total = max(sum(histogram.values()), 1)
+        ranking = [(language, score / total) for language, score in zip(languages, scores)]
+        ranking.sort(key=lambda pair: pair[1])
+
+        return ranking
+
+    @staticmethod
+    def detectText(text: str, languages: Optional[Iterable[str]] = None) -> str:
+        """
+        Finds the most likely language of a text
+        Args:
+            text: the text
+            languages: the languages to consider. If None, uses all available languages
+        Returns:
+            the name of the language
+        """
+
+        return LanguageRegistry.detect(Counter(Protocol.textToInts(text)), languages)[0][0]
+
+
+if __name__ == "__main__":
+    print(f"Languages: {LanguageRegistry.getLanguages()}")
+    for sample in ("Bonjour, comment allez-vous aujourd'hui ?", "zzqx kkwv jjjj"):
+        print(f"{sample!r}: {LanguageRegistry.detect(Counter(Protocol.textToInts(sample)))}")
@@ -1,54 +1,272 @@
+import os
 import random
 import re
-from typing import Optional, Callable
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Callable, NamedTuple, Union
 
 from client.client import Client
 from client.protocol import Protocol
 from crypto.algorithm import Algorithm
-from math_utils.modulo import extendedGCD
-from math_utils.primes import areCoprimes, getLargestPrime
-from math_utils.ring import Ring
+from crypto.key_pool import KeyPool
+from math_utils.modulo import extendedGCD, getModularInverse
+from math_utils.primes import areCoprimes, getLargestPrime, getRandomPrime
+
+
+class RSAPrivateKey(NamedTuple):
+    """
+    RSA private key, optionally with the parameters used by the Chinese Remainder Theorem:
+    the primes `p` and `q`, `dP` = d mod (p-1), `dQ` = d mod (q-1) and `qInv` = q^-1 mod p
+    """
+
+    n: int
+    d: int
+    p: Optional[int] = None
+    q: Optional[int] = None
+    dP: Optional[int] = None
+    dQ: Optional[int] = None
+    qInv: Optional[int] = None
+
+    @staticmethod
+    def fromPrimes(p: int, q: int, d: int) -> "RSAPrivateKey":
+        """
+        Builds a private key and its CRT parameters from the primes and private exponent
+        Args:
+            p: the first prime
+            q: the second prime
+            d: the private exponent
+        Returns:
+            the private key
+        """
+
+        return RSAPrivateKey(p * q, d, p, q, d % (p - 1), d % (q - 1), getModularInverse(q, p))
 
 
 class RSAEncryption(Algorithm):
     NAME = "RSA"
 
-    def __init__(self, publicKey: tuple[int, int], privateKey: Optional[tuple[int, int]] = None):
+    PUBLIC_EXPONENT = 65537
+    # Below these limits, dispatching to the worker processes costs more than decrypting serially
+    # (see benchmarks/rsa_decode.py): with 32-bit task keys, even 256 distinct blocks decrypt faster serially
+    PARALLEL_MIN_BLOCKS = 8
+    PARALLEL_MIN_KEY_BITS = 512
+    MIN_KEY_BITS = 512
+    MAX_KEY_BITS = 4096
+    ENCODING_CACHE_SIZE = 64
+
+    # Already encrypted characters of the most recently used public keys, see `getEncodingTable`
+    encodingTables: OrderedDict[tuple[int, int], dict[str, bytes]] = OrderedDict()
+    encodingTablesLock: threading.Lock = threading.Lock()
+
+    # Worker processes shared by every `decryptParallel` call, see `getExecutor`
+    executor: Optional[ProcessPoolExecutor] = None
+    executorWorkers: int = 0
+    executorLock: threading.Lock = threading.Lock()
+
+    # Pre-generated key pairs used by `decryptTask`, see `createKeyPool`
+    keyPool: Optional[KeyPool[tuple[tuple[int, int], RSAPrivateKey]]] = None
+
+    def __init__(self, publicKey: tuple[int, int], privateKey: Optional[Union[tuple[int, ...], RSAPrivateKey]] = None):
         super().__init__()
         self.publicKey: tuple[int, int] = publicKey
-        self.privateKey: Optional[tuple[int, int]] = privateKey
+        if privateKey is not None and not isinstance(privateKey, RSAPrivateKey):
+            privateKey = RSAPrivateKey(*privateKey)
+        self.privateKey: Optional[RSAPrivateKey] = privateKey
 
     def __repr__(self):
         return f"<RSA(public={self.publicKey}, private={self.privateKey})>"
 
+    @property
+    def blockSize(self) -> int:
+        """
+        Number of bytes of each encrypted value: `Protocol.BYTE_SIZE`, or more
+        if the modulus does not fit in it
+        """
+
+        return max(Protocol.BYTE_SIZE, (self.publicKey[0].bit_length() + 7) // 8)
+
     def encode(self, plaintext: str) -> bytes:
-        out = b""
+        """
+        Encrypts a message, character by character
+
+        Each distinct character is only encrypted once per public key (see
+        `getEncodingTable`), the output is then assembled in a single allocation
+        Args:
+            plaintext: the message to encrypt
+        Returns:
+            the encrypted blocks, `blockSize` bytes per character
+        """
 
         n, e = self.publicKey
-        ring = Ring(n)
-        for i in range(len(plaintext)):
-            value = Protocol.charToInt(plaintext[i])
-            encodedValue = ring.fastPow(value, e)
-            out += Protocol.intToPaddedBytes(encodedValue)
+        blockSize = self.blockSize
+        table = RSAEncryption.getEncodingTable(n, e)
+
+        for char in set(plaintext).difference(table):
+            table[char] = pow(Protocol.charToInt(char), e, n).to_bytes(blockSize, "big")
 
-        return out
+        return b"".join(map(table.__getitem__, plaintext))
+
+    @staticmethod
+    def getEncodingTable(n: int, e: int) -> dict[str, bytes]:
+        """
+        Returns the table of already encrypted characters for a public key
+
+        The tables are kept in `encodingTables`, from the least to the most
+        recently used key. When more than `ENCODING_CACHE_SIZE` keys are used,
+        the table of the least recently used one is dropped
+        Args:
+            n: the modulus of the public key
+            e: the exponent of the public key
+        Returns:
+            a dictionary mapping characters to their encrypted block, filled by `encode`
+        """
+
+        key = (n, e)
+        tables = RSAEncryption.encodingTables
+
+        with RSAEncryption.encodingTablesLock:
+            table = tables.get(key)
+
+            if table is not None:
+                tables.move_to_end(key)
+                return table
+
+            table = tables[key] = {}
+            if len(tables) > RSAEncryption.ENCODING_CACHE_SIZE:
+                tables.popitem(last=False)
+
+            return table
+
+    def decode(self, ciphertext: bytes, workers: Optional[int] = None) -> str:
+        """
+        Decrypts a message
+
+        Each distinct block is only decrypted once. With large keys and enough
+        distinct blocks, they are decrypted in parallel by `workers` processes
+        Args:
+            ciphertext: the encrypted blocks, `blockSize` bytes each
+            workers: the maximum number of processes. If None, uses the number of CPUs,
+                if 1, always decrypts in the current process
+        Returns:
+            the decrypted message
+        """
 
-    def decode(self, ciphertext: bytes) -> str:
         if self.privateKey is None:
             raise Exception("Cannot decode without a private key")
 
-        ints = Protocol.groupBytesIntoInt(ciphertext)
-        out = []
+        blockSize = self.blockSize
+        if blockSize == Protocol.BYTE_SIZE:
+            ints = Protocol.groupBytesIntoInt(ciphertext)
+        else:
+            ints = [int.from_bytes(ciphertext[i:i + blockSize], "big") for i in range(0, len(ciphertext), blockSize)]
+
+        encodedValues = list(set(ints))
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        parallel = (
+            workers > 1
+            and len(encodedValues) >= RSAEncryption.PARALLEL_MIN_BLOCKS
+            and self.privateKey.n.bit_length() >= RSAEncryption.PARALLEL_MIN_KEY_BITS
+        )
+
+        if parallel:
+            decodedValues = self.decryptParallel(encodedValues, workers)
+        else:
+            decodedValues = self.decryptChunk(encodedValues)
 
-        n, d = self.privateKey
-        ring = Ring(n)
-        for i in range(len(ints)):
-            encodedValue = ints[i]
-            value = ring.fastPow(encodedValue, d)
-            out.append(value)
+        values = dict(zip(encodedValues, decodedValues))
+        out = list(map(values.__getitem__, ints))
 
         return bytes(out).decode("UTF-8")
 
+    def decryptParallel(self, encodedValues: list[int], workers: int) -> list[int]:
+        """
+        Decrypts values in chunks spread over a pool of processes
+        Args:
+            encodedValues: the encrypted values
+            workers: the number of processes
+        Returns:
+            the decrypted values, in the same order
+        """
+
+        chunkSize = -(-len(encodedValues) // workers)
+        chunks = [encodedValues[i:i + chunkSize] for i in range(0, len(encodedValues), chunkSize)]
+        executor = RSAEncryption.getExecutor(workers)
+
+        try:
+            results = executor.map(self.decryptChunk, chunks)
+            return [value for chunk in results for value in chunk]
+
+        # A worker died, the pool is restarted by the next call
+        except BrokenProcessPool:
+            with RSAEncryption.executorLock:
+                if RSAEncryption.executor is executor:
+                    RSAEncryption.executor = None
+
+            return self.decryptChunk(encodedValues)
+
+    @staticmethod
+    def getExecutor(workers: int) -> ProcessPoolExecutor:
+        """
+        Returns the process pool shared by all decryptions
+
+        The pool is started on first use and kept for the lifetime of the
+        process, so its workers are only spawned once. It is only replaced
+        when more workers are requested
+        Args:
+            workers: the minimum number of processes
+        Returns:
+            the shared process pool
+        """
+
+        with RSAEncryption.executorLock:
+            if RSAEncryption.executor is None or RSAEncryption.executorWorkers < workers:
+                if RSAEncryption.executor is not None:
+                    RSAEncryption.executor.shutdown(wait=False)
+
+                RSAEncryption.executor = ProcessPoolExecutor(max_workers=workers)
+                RSAEncryption.executorWorkers = workers
+
+            return RSAEncryption.executor
+
+    def decryptChunk(self, encodedValues: list[int]) -> list[int]:
+        """
+        Decrypts a list of values in the current process
+        Args:
+            encodedValues: the encrypted values
+        Returns:
+            the decrypted values, in the same order
+        """
+
+        return [self.decryptValue(encodedValue) for encodedValue in encodedValues]
+
+    def decryptValue(self, encodedValue: int) -> int:
+        """
+        Decrypts a single value with the private key
+
+        If the key carries its CRT parameters, the exponentiation is done
+        modulo p and q separately (with exponents half the size) and the
+        results are recombined, which is about 3 to 4 times faster
+        Args:
+            encodedValue: the encrypted value
+        Returns:
+            the decrypted value
+        """
+
+        key = self.privateKey
+
+        if key.p is None or key.dP is None:
+            return pow(encodedValue, key.d, key.n)
+
+        m1 = pow(encodedValue, key.dP, key.p)
+        m2 = pow(encodedValue, key.dQ, key.q)
+        h = key.qInv * (m1 - m2) % key.p
+
+        return m2 + h * key.q
+
     @staticmethod
     def parseTaskKey(msg: str) -> tuple[int, int]:
         m: Optional[re.Match[str]] = re.search(r"n=(\d+), e=(\d+)", msg)
@@ -61,13 +279,24 @@ class RSAEncryption(Algorithm):
         return publicKey
 
     @staticmethod
-    def generateKeyPair() -> tuple[tuple[int, int], tuple[int, int]]:
+    def generateKeyPair(bits: Optional[int] = None) -> tuple[tuple[int, int], RSAPrivateKey]:
         """
         Generates a public/private key pair
+
+        Without a size, the modulus fits in `Protocol.BYTE_SIZE` bytes as
+        required by the server tasks
+        Args:
+            bits: the size of the modulus, between `MIN_KEY_BITS` and `MAX_KEY_BITS`.
+                If None, generates a small key
         Returns:
             a tuple containing the public and private key (in this order)
+        Raises:
+            ValueError: if the key size is out of bounds
         """
 
+        if bits is not None:
+            return RSAEncryption.generateLargeKeyPair(bits)
+
         # Find 2 large prime numbers p and q, with a large difference
         maxP: int = random.randint(15_000, 20_000)
         p: int = getLargestPrime(maxP)
@@ -94,14 +323,71 @@ class RSAEncryption(Algorithm):
         d: int = bezoutA
 
         publicKey = (n, e)
-        privateKey = (n, d)
+        privateKey = RSAPrivateKey.fromPrimes(p, q, d)
+
+        return (publicKey, privateKey)
+
+    @staticmethod
+    def generateLargeKeyPair(bits: int) -> tuple[tuple[int, int], RSAPrivateKey]:
+        """
+        Generates a public/private key pair with a modulus of the given size,
+        from two random probable primes and the public exponent `PUBLIC_EXPONENT`
+        Args:
+            bits: the size of the modulus, between `MIN_KEY_BITS` and `MAX_KEY_BITS`
+        Returns:
+            a tuple containing the public and private key (in this order)
+        Raises:
+            ValueError: if the key size is out of bounds
+        """
+
+        if not RSAEncryption.MIN_KEY_BITS <= bits <= RSAEncryption.MAX_KEY_BITS:
+            raise ValueError(f"Key size must be between {RSAEncryption.MIN_KEY_BITS} "
+                             f"and {RSAEncryption.MAX_KEY_BITS} bits (not {bits})")
+
+        e: int = RSAEncryption.PUBLIC_EXPONENT
+
+        while True:
+            p: int = getRandomPrime(bits // 2)
+            q: int = getRandomPrime(bits - bits // 2)
+            k: int = (p - 1) * (q - 1)
+
+            if p != q and areCoprimes(e, k):
+                break
+
+        d: int = getModularInverse(e, k)
+
+        publicKey = (p * q, e)
+        privateKey = RSAPrivateKey.fromPrimes(p, q, d)
 
         return (publicKey, privateKey)
 
+    @staticmethod
+    def createKeyPool(bits: Optional[int] = None, **kwargs) -> KeyPool[tuple[tuple[int, int], RSAPrivateKey]]:
+        """
+        Creates and starts a pool of pre-generated key pairs, used by `decryptTask`
+        Args:
+            bits: the size of the keys (see `generateKeyPair`)
+            **kwargs: the options of the pool (capacity, low-water mark, refill rate, persistence path)
+        Returns:
+            the started key pool
+        """
+
+        RSAEncryption.keyPool = KeyPool(
+            lambda: RSAEncryption.generateKeyPair(bits),
+            serialize=lambda pair: [list(pair[0]), list(pair[1])],
+            deserialize=lambda data: (tuple(data[0]), RSAPrivateKey(*data[1])),
+            **kwargs
+        ).start()
+
+        return RSAEncryption.keyPool
+
     @staticmethod
     def decryptTask(taskMsg: str, sendFunc: Callable, receiveFunc: Callable) -> None:
-        # Generate key pair
-        public, private = RSAEncryption.generateKeyPair()
+        # Generate key pair (or take a pre-generated one)
+        if RSAEncryption.keyPool is not None:
+            public, private = RSAEncryption.keyPool.get()
+        else:
+            public, private = RSAEncryption.generateKeyPair()
         publicStr = f"{public[0]},{public[1]}"
         decryptor = RSAEncryption(public, private)
         print(decryptor)
@@ -134,3 +420,13 @@ if __name__ == "__main__":
     print(encoded)
     decoded = rsa.decode(encoded)
     print(decoded)
+    assert RSAEncryption.encodingTables[public].keys() == set(msg)
+
+    import time
+    for size in (512, 1024, 2048, 4096):
+        t1 = time.perf_counter()
+        public, private = RSAEncryption.generateKeyPair(size)
+        t2 = time.perf_counter()
+        rsa = RSAEncryption(public, private)
+        assert rsa.decode(rsa.encode(msg)) == msg
+        print(f"{size}-bit key pair generated in {(t2 - t1) * 1000:.1f}ms")
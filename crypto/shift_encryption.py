@@ -1,6 +1,32 @@
+from functools import lru_cache
+from typing import NamedTuple
+
 from client.protocol import Protocol
 from crypto.algorithm import Algorithm
 
+TABLE_CACHE_SIZE = 64
+# Maximum number of symbols memoised in each dictionary of a key's tables
+TABLE_MAX_SYMBOLS = 4096
+
+
+class ShiftTables(NamedTuple):
+    """
+    Translation tables of a shift key
+
+    `chars` maps characters to their encrypted slot bytes and `values` maps
+    encrypted values to the decrypted UTF-8 bytes, both filled on demand with
+    at most `TABLE_MAX_SYMBOLS` entries (ciphertext values are arbitrary).
+    `encodeBytes` and `decodeBytes` translate single bytes, except for the
+    `plainInvalid` / `cipherInvalid` ones whose shifted value leaves a byte
+    """
+
+    chars: dict[str, bytes]
+    values: dict[int, bytes]
+    encodeBytes: bytes
+    decodeBytes: bytes
+    plainInvalid: bytes
+    cipherInvalid: bytes
+
 
 class ShiftEncryption(Algorithm):
     NAME = "shift"
@@ -13,25 +39,126 @@ class ShiftEncryption(Algorithm):
         return f"<Shift(key={self.key})>"
 
     def encode(self, plaintext: str) -> bytes:
-        out = b""
+        """
+        Encodes a message with the key's translation tables
+
+        ASCII messages whose shifted values still fit in a byte are translated
+        at once and copied into the last byte of each slot, other messages are
+        encoded with each distinct character being shifted once
+        Args:
+            plaintext: the message to encode
+        Returns:
+            the padded bytes of the encrypted message
+        """
+
+        tables = self.getTables(self.key)
 
-        for i in range(len(plaintext)):
-            value = Protocol.charToInt(plaintext[i])
-            encodedValue = value + self.key
+        if plaintext.isascii():
+            plainBytes = plaintext.encode("ascii")
+            shiftedBytes = plainBytes.translate(tables.encodeBytes, tables.plainInvalid)
 
-            out += Protocol.intToPaddedBytes(encodedValue)
+            if len(shiftedBytes) == len(plainBytes):
+                out = bytearray(len(plainBytes) * Protocol.BYTE_SIZE)
+                out[Protocol.BYTE_SIZE - 1::Protocol.BYTE_SIZE] = shiftedBytes
+                return bytes(out)
 
-        return out
+        chars = {}
+        for char in set(plaintext):
+            encodedBytes = tables.chars.get(char)
+
+            if encodedBytes is None:
+                encodedValue = Protocol.charToInt(char) + self.key
+                encodedBytes = Protocol.intToPaddedBytes(encodedValue)
+
+                if len(tables.chars) < TABLE_MAX_SYMBOLS:
+                    tables.chars[char] = encodedBytes
+                if len(tables.values) < TABLE_MAX_SYMBOLS:
+                    tables.values.setdefault(encodedValue, char.encode("utf-8"))
+
+            chars[char] = encodedBytes
+
+        return b"".join(map(chars.__getitem__, plaintext))
 
     def decode(self, ciphertext: bytes) -> str:
+        """
+        Decodes a message encrypted by `encode` with the key's translation tables
+
+        Messages of single-byte values are translated at once, other messages
+        are decoded with each distinct value being shifted once
+        Args:
+            ciphertext: the padded bytes of the encrypted message
+        Returns:
+            the decoded message
+        """
+
+        tables = self.getTables(self.key)
+
+        if len(ciphertext) % Protocol.BYTE_SIZE == 0:
+            highBytes = bytearray(ciphertext)
+            del highBytes[Protocol.BYTE_SIZE - 1::Protocol.BYTE_SIZE]
+
+            if highBytes.count(0) == len(highBytes):
+                cipherBytes = bytes(ciphertext[Protocol.BYTE_SIZE - 1::Protocol.BYTE_SIZE])
+                plainBytes = cipherBytes.translate(tables.decodeBytes, tables.cipherInvalid)
+
+                if len(plainBytes) == len(cipherBytes):
+                    return plainBytes.decode("UTF-8")
+
         ints = Protocol.groupBytesIntoInt(ciphertext)
-        out = []
 
-        for i in range(len(ints)):
-            out.append(ints[i] - self.key)
+        values = {}
+        for value in set(ints):
+            decodedBytes = tables.values.get(value)
+
+            if decodedBytes is None:
+                decodedValue = value - self.key
+                decodedBytes = decodedValue.to_bytes(max(1, (decodedValue.bit_length() + 7) // 8), "big")
+
+                if len(tables.values) < TABLE_MAX_SYMBOLS:
+                    tables.values[value] = decodedBytes
+
+            values[value] = decodedBytes
+
+        return b"".join(map(values.__getitem__, ints)).decode("UTF-8")
 
-        return bytes(out).decode("UTF-8")
+    @staticmethod
+    @lru_cache(maxsize=TABLE_CACHE_SIZE)
+    def getTables(key: int) -> "ShiftTables":
+        """
+        Returns the translation tables of a key
+
+        The tables of the `TABLE_CACHE_SIZE` most recently used keys are kept,
+        their dictionaries are filled by both `encode` and `decode`, up to
+        `TABLE_MAX_SYMBOLS` symbols each
+        Args:
+            key: the shift key
+        Returns:
+            the translation tables
+        """
+
+        plainValues = range(max(0, -key), min(256, 256 - key))
+        plainBytes = bytes(plainValues)
+        cipherBytes = bytes(value + key for value in plainValues)
+
+        return ShiftTables(
+            chars={},
+            values={},
+            encodeBytes=bytes.maketrans(plainBytes, cipherBytes),
+            decodeBytes=bytes.maketrans(cipherBytes, plainBytes),
+            plainInvalid=bytes(set(range(256)).difference(plainBytes)),
+            cipherInvalid=bytes(set(range(256)).difference(cipherBytes))
+        )
 
     @staticmethod
     def parseTaskKey(msg: str) -> int:
         return int(msg.rsplit(" ", 1)[1])
+
+
+if __name__ == '__main__':
+    shift = ShiftEncryption(3)
+
+    # The memoised symbols stay bounded, whatever the number of distinct symbols
+    text = "".join(map(chr, range(0x4E00, 0x4E00 + 2 * TABLE_MAX_SYMBOLS)))
+    assert shift.decode(shift.encode(text)) == text
+    tables = ShiftEncryption.getTables(shift.key)
+    assert len(tables.chars) <= TABLE_MAX_SYMBOLS and len(tables.values) <= TABLE_MAX_SYMBOLS
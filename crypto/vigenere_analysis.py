@@ -0,0 +1,218 @@
+import operator
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterable, Optional
+
+from client.protocol import Protocol
+from crypto.frequency_analysis import FrequencyAnalysis
+from crypto.language_registry import LanguageRegistry
+from crypto.vigenere_encryption import VigenereEncryption
+
+
+class VigenereAnalysis:
+    """
+    Breaks Vigenère ciphers
+
+    The key length is estimated with the index of coincidence of the columns
+    (symbols encrypted with the same key character), then each column is
+    broken as a shift cipher with `FrequencyAnalysis.rankKeys` in every
+    language, and the language best explaining the whole decryption is kept
+    """
+
+    MAX_KEY_LENGTH = 32
+    # Minimum number of symbols per column for a key length to be considered
+    MIN_COLUMN_LENGTH = 16
+    # A divisor of the best key length is accepted if its index of coincidence reaches this ratio of the best one
+    COINCIDENCE_TOLERANCE = 0.8
+    # Ciphertexts with fewer symbols are cracked in the current process
+    PARALLEL_MIN_SYMBOLS = 20_000
+
+    def __init__(self, languages: Optional[Iterable[str]] = None) -> None:
+        """
+        Args:
+            languages: the candidate plaintext languages. If None, uses all available languages
+        """
+
+        self.languages: tuple[str, ...] = LanguageRegistry.getLanguages() if languages is None else tuple(languages)
+        # Detected language of the last cracked ciphertext
+        self.language: Optional[str] = None
+
+    @staticmethod
+    def getIndexOfCoincidence(values: list[int]) -> float:
+        """
+        Computes the probability that two symbols picked at random are identical
+        Args:
+            values: the symbol values
+        Returns:
+            the index of coincidence, or 0 if there are less than 2 values
+        """
+
+        total = len(values)
+        if total < 2:
+            return 0
+
+        return sum(count * (count - 1) for count in Counter(values).values()) / (total * (total - 1))
+
+    @staticmethod
+    def getKeyLengthScores(values: list[int], maxLength: int = MAX_KEY_LENGTH) -> dict[int, float]:
+        """
+        Computes the index of coincidence of the columns for each key length
+
+        The coincidences of all columns are pooled, rather than averaging one
+        index per column, so that short columns add less noise
+        Args:
+            values: the ciphertext symbol values
+            maxLength: the maximum key length to try
+        Returns:
+            the score of each key length. Lengths leaving less than `MIN_COLUMN_LENGTH` symbols per column are skipped
+        """
+
+        maxLength = max(1, min(maxLength, len(values) // VigenereAnalysis.MIN_COLUMN_LENGTH))
+        scores = {}
+
+        for length in range(1, maxLength + 1):
+            coincidences = 0
+            pairs = 0
+
+            for i in range(length):
+                column = values[i::length]
+                coincidences += sum(count * (count - 1) for count in Counter(column).values())
+                pairs += len(column) * (len(column) - 1)
+
+            scores[length] = coincidences / pairs if pairs != 0 else 0
+
+        return scores
+
+    @staticmethod
+    def findKeyLength(values: list[int], maxLength: int = MAX_KEY_LENGTH) -> int:
+        """
+        Estimates the key length of a ciphertext
+
+        Multiples of the key length score as well as the key length itself,
+        so the smallest divisor of the best length scoring close enough to
+        it is chosen
+        Args:
+            values: the ciphertext symbol values
+            maxLength: the maximum key length to try
+        Returns:
+            the most likely key length
+        """
+
+        scores = VigenereAnalysis.getKeyLengthScores(values, maxLength)
+        bestLength = max(scores, key=scores.get)
+        threshold = scores[bestLength] * VigenereAnalysis.COINCIDENCE_TOLERANCE
+
+        return min(
+            length for length in scores
+            if bestLength % length == 0 and scores[length] >= threshold
+        )
+
+    def crack(self, ciphertext: bytes, keyLength: Optional[int] = None, workers: Optional[int] = None) -> str:
+        """
+        Finds the most likely key of a ciphertext, and stores the detected language in `language`
+
+        If the ciphertext has at least `PARALLEL_MIN_SYMBOLS` symbols, the
+        columns are solved in parallel by `workers` processes
+        Args:
+            ciphertext: the encrypted message
+            keyLength: the length of the key. If None, it is estimated with `findKeyLength`
+            workers: the maximum number of processes. If None, uses the number of CPUs
+        Returns:
+            the key
+        Raises:
+            ValueError: if there is no language to consider or no valid key character decrypts a column
+        """
+
+        values = Protocol.groupBytesIntoInt(ciphertext)
+
+        if keyLength is None:
+            keyLength = self.findKeyLength(values)
+
+        columns = [values[i::keyLength] for i in range(keyLength)]
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        workers = min(workers, keyLength)
+
+        if workers > 1 and len(values) >= self.PARALLEL_MIN_SYMBOLS:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    FrequencyAnalysis.crackColumn,
+                    columns, repeat(self.languages), repeat(operator.sub), repeat(VigenereAnalysis.isKeyValue)
+                ))
+        else:
+            results = [
+                FrequencyAnalysis.crackColumn(column, self.languages, operator.sub, VigenereAnalysis.isKeyValue)
+                for column in columns
+            ]
+
+        self.language, shifts = FrequencyAnalysis.chooseLanguage(results, self.languages)
+
+        return "".join(map(self.intToChar, shifts))
+
+    @staticmethod
+    def isKeyValue(value: int) -> bool:
+        """
+        Checks that a shift is the value of a single character, and can thus be part of a key
+        Args:
+            value: the shift
+        Returns:
+            True if the shift is the value of a character (see `Protocol.charToInt`), False otherwise
+        """
+
+        if not FrequencyAnalysis.isShiftKey(value):
+            return False
+
+        try:
+            return len(VigenereAnalysis.intToChar(value)) == 1
+        except UnicodeDecodeError:
+            return False
+
+    @staticmethod
+    def intToChar(value: int) -> str:
+        """
+        Converts a symbol value back to its character (inverse of `Protocol.charToInt`)
+        Args:
+            value: the symbol value (>= 0)
+        Returns:
+            the character
+        Raises:
+            UnicodeDecodeError: if the value is not the UTF-8 encoding of a character
+        """
+
+        return value.to_bytes(max(1, (value.bit_length() + 7) // 8), "big").decode("utf-8")
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from utils import getRootPath
+
+    with open(os.path.join(getRootPath(), "res", "francais.txt"), "r", encoding="utf-8") as f:
+        words = f.read().split()
+
+    plaintext = " ".join(random.choices(words, k=20_000))[:100_000]
+    vig = VigenereEncryption("CryptoChat")
+    ciphertext = vig.encode(plaintext)
+
+    analysis = VigenereAnalysis()
+    start = time.perf_counter()
+    foundKey = analysis.crack(ciphertext)
+    duration = time.perf_counter() - start
+
+    print(f"Found key '{foundKey}' ({analysis.language}) in {duration:.2f}s ({len(plaintext)} symbols)")
+    assert foundKey == "CryptoChat"
+
+    # End-to-end check on a known message
+    plaintext = ("La cryptographie est une des disciplines de la cryptologie s'attachant a proteger des messages "
+                 "(assurant confidentialite, authenticite et integrite) en s'aidant souvent de secrets ou cles. "
+                 "Elle se distingue de la steganographie qui fait passer inapercu un message dans un autre message "
+                 "alors que la cryptographie rend un message supposement inintelligible a autre que qui de droit.")
+    ciphertext = VigenereEncryption("ISC").encode(plaintext)
+    foundKey = analysis.crack(ciphertext)
+    assert foundKey == "ISC", foundKey
+    assert VigenereEncryption(foundKey).decode(ciphertext) == plaintext
@@ -1,4 +1,6 @@
-from typing import List
+import operator
+from itertools import cycle
+
 from client.protocol import Protocol
 
 from crypto.algorithm import Algorithm
@@ -14,35 +16,48 @@ class VigenereEncryption(Algorithm):
     def __repr__(self):
         return f"<Vigénère(key={self.key})>"
 
+    def getKeyValues(self) -> list[int]:
+        """
+        Converts the key into the int values added to the message, once per message
+        Returns:
+            the int value of each key character (see `Protocol.charToInt`)
+        Raises:
+            ValueError: if the key is empty
+        """
+
+        if len(self.key) == 0:
+            raise ValueError("The key must not be empty")
+
+        return Protocol.textToInts(self.key)
+
     def encode(self, plaintext: str) -> bytes:
-        vig_key = self.key
-        count = 0
-        out = b""
-        for i in range(len(plaintext)):
-            plainChar = Protocol.charToInt(plaintext[i])
-            keyChar = Protocol.charToInt(vig_key[count])
-
-            encodedValue = plainChar + keyChar
-            out += Protocol.intToPaddedBytes(encodedValue)
-            count += 1
-            if count == len(vig_key):
-                count = 0
-        return out
+        """
+        Encodes a message, with the key repeated over the whole message and packed in one pass
+        Args:
+            plaintext: the message to encode
+        Returns:
+            the padded bytes of the encrypted message
+        """
+
+        if len(plaintext) == 0:
+            return b""
+
+        return Protocol.packInts(map(operator.add, Protocol.textToInts(plaintext), cycle(self.getKeyValues())))
 
     def decode(self, ciphertext: bytes) -> str:
-        vig_key = self.key
-        ints = Protocol.groupBytesIntoInt(ciphertext)
-        out = []
-        count = 0
+        """
+        Decodes a message encrypted by `encode`
+        Args:
+            ciphertext: the padded bytes of the encrypted message
+        Returns:
+            the decoded message
+        """
 
-        for i in range(len(ints)):
-            keyChar = int.from_bytes(vig_key[count].encode("utf-8"), "big")
-            out.append(ints[i] - keyChar)
-            count += 1
-            if count == len(vig_key):
-                count = 0
+        if len(ciphertext) == 0:
+            return ""
 
-        return bytes(out).decode("UTF-8")
+        ints = Protocol.groupBytesIntoInt(ciphertext)
+        return Protocol.symbolsToText(list(map(operator.sub, ints, cycle(self.getKeyValues()))))
 
     @staticmethod
     def parseTaskKey(msg: str) -> str:
@@ -56,3 +71,7 @@ if __name__ == '__main__':
     ciphertext = vig.encode(plaintext)
     print(ciphertext)
     print(vig.decode(ciphertext))
+
+    # Round trips, including NUL characters
+    for plaintext in ("a\x00fY", "\x00", "\x00\x00\x00\x00", "héllo\x00 ✓"):
+        assert vig.decode(vig.encode(plaintext)) == plaintext
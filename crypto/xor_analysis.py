@@ -0,0 +1,144 @@
+import operator
+from typing import Iterable, Optional
+
+from client.protocol import Protocol
+from crypto.frequency_analysis import FrequencyAnalysis
+from crypto.language_registry import LanguageRegistry
+from crypto.xor_encryption import XOREncryption
+
+
+class XORAnalysis:
+    """
+    Breaks repeating-key XOR ciphers
+
+    The key size is estimated with the Hamming distance between the
+    ciphertext and itself shifted by the key size (the key cancels out), then
+    each column is broken with `FrequencyAnalysis.rankKeys` in every language,
+    and the language best explaining the whole decryption is kept
+    """
+
+    MAX_KEY_SIZE = 32
+    # A divisor of the best key size is accepted if its distance is at most this ratio of the best one
+    DISTANCE_TOLERANCE = 1.3
+
+    def __init__(self, languages: Optional[Iterable[str]] = None) -> None:
+        """
+        Args:
+            languages: the candidate plaintext languages. If None, uses all available languages
+        """
+
+        self.languages: tuple[str, ...] = LanguageRegistry.getLanguages() if languages is None else tuple(languages)
+        # Detected language of the last cracked ciphertext
+        self.language: Optional[str] = None
+
+    @staticmethod
+    def getHammingDistance(a: bytes, b: bytes) -> int:
+        """
+        Counts the differing bits of two byte strings of the same length
+        Args:
+            a: the first bytes
+            b: the second bytes
+        Returns:
+            the number of differing bits
+        """
+
+        return bin(int.from_bytes(a, "big") ^ int.from_bytes(b, "big")).count("1")
+
+    @staticmethod
+    def getKeySizeScores(ciphertext: bytes, maxSize: int = MAX_KEY_SIZE) -> dict[int, float]:
+        """
+        Computes, for each key size, the normalized Hamming distance between the
+        ciphertext and itself shifted by that many slots
+
+        When the shift is a multiple of the key size, both slots were XORed with the
+        same key value, so the distance is the (low) distance between plaintext symbols
+        Args:
+            ciphertext: the encrypted message
+            maxSize: the maximum key size to try, in slots
+        Returns:
+            the average number of differing bits per byte for each key size (lower is more likely)
+        """
+
+        slotsCount = len(ciphertext) // Protocol.BYTE_SIZE
+        maxSize = max(1, min(maxSize, slotsCount // 2))
+        scores = {}
+
+        for size in range(1, maxSize + 1):
+            shift = size * Protocol.BYTE_SIZE
+            length = len(ciphertext) - shift
+            scores[size] = XORAnalysis.getHammingDistance(ciphertext[:length], ciphertext[shift:]) / max(length, 1)
+
+        return scores
+
+    @staticmethod
+    def findKeySize(ciphertext: bytes, maxSize: int = MAX_KEY_SIZE) -> int:
+        """
+        Estimates the key size of a ciphertext
+
+        Multiples of the key size score as well as the key size itself,
+        so the smallest divisor of the best size scoring close enough to it is chosen
+        Args:
+            ciphertext: the encrypted message
+            maxSize: the maximum key size to try, in slots
+        Returns:
+            the most likely key size
+        """
+
+        scores = XORAnalysis.getKeySizeScores(ciphertext, maxSize)
+        bestSize = min(scores, key=scores.get)
+        threshold = scores[bestSize] * XORAnalysis.DISTANCE_TOLERANCE
+
+        return min(
+            size for size in scores
+            if bestSize % size == 0 and scores[size] <= threshold
+        )
+
+    def crack(self, ciphertext: bytes, keySize: Optional[int] = None) -> tuple[int, ...]:
+        """
+        Finds the most likely key of a ciphertext, and stores the detected language in `language`
+        Args:
+            ciphertext: the encrypted message
+            keySize: the number of values of the key. If None, it is estimated with `findKeySize`
+        Returns:
+            the key values
+        Raises:
+            ValueError: if there is no language to consider or no valid key
+        """
+
+        if keySize is None:
+            keySize = self.findKeySize(ciphertext)
+
+        values = Protocol.groupBytesIntoInt(ciphertext)
+        results = [
+            FrequencyAnalysis.crackColumn(values[i::keySize], self.languages, operator.xor)
+            for i in range(keySize)
+        ]
+
+        self.language, keys = FrequencyAnalysis.chooseLanguage(results, self.languages)
+
+        return tuple(keys)
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import time
+
+    from utils import getRootPath
+
+    with open(os.path.join(getRootPath(), "res", "francais.txt"), "r", encoding="utf-8") as f:
+        words = f.read().split()
+
+    plaintext = " ".join(random.choices(words, k=2_000))[:10_000]
+    key = tuple(random.randrange(1 << 32) for _ in range(5))
+    ciphertext = XOREncryption(key).encode(plaintext)
+
+    analysis = XORAnalysis()
+    start = time.perf_counter()
+    foundKey = analysis.crack(ciphertext)
+    duration = time.perf_counter() - start
+
+    print(f"Key:   {key}")
+    print(f"Found: {foundKey} ({analysis.language}) in {duration:.2f}s ({len(plaintext)} symbols)")
+    assert foundKey == key
+    assert XOREncryption(foundKey).decode(ciphertext) == plaintext
@@ -1,22 +1,66 @@
+from typing import Sequence, Union
+
+from client.protocol import Protocol
 from crypto.algorithm import Algorithm
 
 
 class XOREncryption(Algorithm):
+    """
+    XOR cipher over the 4-byte slots of the protocol
+
+    The slot value of each character is XORed with the key, or with the
+    successive values of a repeating key. Whole messages are processed at
+    once as big integers instead of character by character
+    """
+
     NAME = "xor"
 
-    def __init__(self, key: int = 0):
+    def __init__(self, key: Union[int, Sequence[int]] = 0):
         super().__init__()
-        self.key = key
+        self.key: Union[int, Sequence[int]] = key
+        self.keyValues: tuple[int, ...] = (key,) if isinstance(key, int) else tuple(key)
 
     def __repr__(self):
         return f"<XOR(key={self.key})>"
 
-    def encode(self, plaintext: str) -> str:
-        ...
+    def xorSlots(self, slots: bytes) -> bytes:
+        """
+        XORs padded bytes with the repeating key
+        Args:
+            slots: the padded bytes (a multiple of `Protocol.BYTE_SIZE` bytes)
+        Returns:
+            the XORed bytes, of the same length
+        Raises:
+            OverflowError: if a key value is negative or does not fit in a slot
+        """
+
+        length = len(slots)
+        if length == 0:
+            return b""
+
+        keyBytes = Protocol.packInts(self.keyValues)
+        keyStream = (keyBytes * -(-length // len(keyBytes)))[:length]
 
-    def decode(self, ciphertext: str) -> str:
-        ...
+        result = int.from_bytes(slots, "big") ^ int.from_bytes(keyStream, "big")
+        return result.to_bytes(length, "big")
+
+    def encode(self, plaintext: str) -> bytes:
+        return self.xorSlots(Protocol.packInts(Protocol.textToInts(plaintext)))
+
+    def decode(self, ciphertext: bytes) -> str:
+        return Protocol.symbolsToText(Protocol.groupBytesIntoInt(self.xorSlots(ciphertext)))
 
     @staticmethod
     def parseTaskKey(msg: str) -> int:
         return int(msg.rsplit(" ", 1)[1])
+
+
+if __name__ == '__main__':
+    xor = XOREncryption((42, 1337, 7))
+    ciphertext = xor.encode("Hello, wörld")
+    print(ciphertext)
+    print(xor.decode(ciphertext))
+
+    # Round trips, including NUL characters and slots XORed to 0
+    for plaintext in ("a\x00fY", "\x00\x00", "*\u0539\x07", "héllo ✓ wörld\x00"):
+        assert xor.decode(xor.encode(plaintext)) == plaintext
@@ -1,10 +1,13 @@
 from client.client import Client
+from crypto.rsa_encryption import RSAEncryption
 from ui.cli import CLI
 
 if __name__ == "__main__":
     print("CryptoChat - HES-SO Valais/Wallis - 2024")
     print("Alexis KUENY & Louis HEREDERO")
 
+    RSAEncryption.createKeyPool()
+
     with Client("vlbelintrocrypto.hevs.ch", 6000) as client:
         cli = CLI(client)
         print(client)
@@ -0,0 +1,251 @@
+from typing import Optional
+
+from math_utils.modulo import getModularInverse
+
+
+class PowEngine:
+    """Base class of the modular exponentiation algorithms used by `Ring`"""
+
+    NAME = ""
+
+    def pow(self, a: int, b: int, modulo: int) -> int:
+        """
+        Raises a number to the given power modulo `modulo`
+        Args:
+            a: the base
+            b: the exponent (>= 0)
+            modulo: the modulo
+        Returns:
+            the exponentiation of `a` to the power of `b`, modulo `modulo`
+        """
+
+        raise NotImplementedError
+
+
+class BuiltinPowEngine(PowEngine):
+    """Python's built-in three-argument `pow`, implemented in C"""
+
+    NAME = "builtin"
+
+    def pow(self, a: int, b: int, modulo: int) -> int:
+        return pow(a, b, modulo)
+
+
+class SquareMultiplyEngine(PowEngine):
+    """Bit by bit (right-to-left) square-and-multiply"""
+
+    NAME = "square-multiply"
+
+    def pow(self, a: int, b: int, modulo: int) -> int:
+        result = 1
+        currentPower: int = a % modulo
+        powerSelect: int = b
+
+        while powerSelect != 0:
+            if powerSelect & 1:
+                result = result * currentPower % modulo
+
+            currentPower = currentPower * currentPower % modulo
+            powerSelect >>= 1
+
+        return result
+
+
+class SlidingWindowEngine(PowEngine):
+    """
+    Left-to-right sliding window exponentiation
+
+    The odd powers a, a^3, ..., a^(2^k - 1) are precomputed, then the exponent
+    is scanned in windows of up to `k` bits starting and ending with a 1,
+    which needs one multiplication per window instead of one per set bit
+    """
+
+    NAME = "sliding-window"
+
+    def __init__(self, windowSize: Optional[int] = None) -> None:
+        self.windowSize: Optional[int] = windowSize
+
+    def pow(self, a: int, b: int, modulo: int) -> int:
+        if b == 0:
+            return 1 % modulo
+
+        k = self.windowSize or self.getWindowSize(b.bit_length())
+        return self.slidingWindow(a % modulo, b, k, lambda x, y: x * y % modulo, 1 % modulo)
+
+    @staticmethod
+    def slidingWindow(a: int, b: int, k: int, multiply, one: int) -> int:
+        """
+        Computes a^b using the given multiplication
+        Args:
+            a: the base
+            b: the exponent (> 0)
+            k: the maximum window size, in bits
+            multiply: the modular multiplication function
+            one: the neutral element of the multiplication
+        Returns:
+            the exponentiation of `a` to the power of `b`
+        """
+
+        # oddPowers[i] = a^(2i + 1)
+        a2 = multiply(a, a)
+        oddPowers = [a]
+        for _ in range((1 << (k - 1)) - 1):
+            oddPowers.append(multiply(oddPowers[-1], a2))
+
+        result = one
+        i = b.bit_length() - 1
+
+        while i >= 0:
+            if not (b >> i) & 1:
+                result = multiply(result, result)
+                i -= 1
+                continue
+
+            # Longest window b[i..j] of at most k bits ending with a 1
+            j = max(i - k + 1, 0)
+            while not (b >> j) & 1:
+                j += 1
+
+            for _ in range(i - j + 1):
+                result = multiply(result, result)
+
+            window = (b >> j) & ((1 << (i - j + 1)) - 1)
+            result = multiply(result, oddPowers[window >> 1])
+            i = j - 1
+
+        return result
+
+    @staticmethod
+    def getWindowSize(bits: int) -> int:
+        """
+        Chooses the window size minimizing the number of multiplications
+        Args:
+            bits: the bit length of the exponent
+        Returns:
+            the window size
+        """
+
+        if bits <= 24:
+            return 1
+        if bits <= 80:
+            return 3
+        if bits <= 240:
+            return 4
+        if bits <= 672:
+            return 5
+        return 6
+
+
+class MontgomeryEngine(PowEngine):
+    """
+    Sliding window exponentiation in Montgomery representation
+
+    Values are stored as x * R mod n (with R = 2^k > n), so that each modular
+    reduction becomes a multiplication, a mask and a shift instead of a
+    division. Only odd moduli are supported, even ones fall back to `pow`
+    """
+
+    NAME = "montgomery"
+
+    def __init__(self, windowSize: Optional[int] = None) -> None:
+        self.windowSize: Optional[int] = windowSize
+        self.contexts: dict[int, tuple[int, int, int, int]] = {}
+
+    def pow(self, a: int, b: int, modulo: int) -> int:
+        if modulo & 1 == 0 or modulo == 1:
+            return pow(a, b, modulo)
+
+        if b == 0:
+            return 1
+
+        bits, mask, nPrime, r2 = self.getContext(modulo)
+
+        def reduce(t: int) -> int:
+            u = (t & mask) * nPrime & mask
+            t = (t + u * modulo) >> bits
+            return t - modulo if t >= modulo else t
+
+        def multiply(x: int, y: int) -> int:
+            return reduce(x * y)
+
+        k = self.windowSize or SlidingWindowEngine.getWindowSize(b.bit_length())
+        aMont = reduce((a % modulo) * r2)
+        oneMont = reduce(r2)
+
+        return reduce(SlidingWindowEngine.slidingWindow(aMont, b, k, multiply, oneMont))
+
+    def getContext(self, modulo: int) -> tuple[int, int, int, int]:
+        """
+        Returns the (cached) Montgomery constants of a modulo
+        Args:
+            modulo: the odd modulo
+        Returns:
+            the number of bits k of R = 2^k, the mask R - 1, n' = -n^-1 mod R and R^2 mod n
+        """
+
+        context = self.contexts.get(modulo)
+
+        if context is None:
+            bits = modulo.bit_length()
+            r = 1 << bits
+            nPrime = (-getModularInverse(modulo, r)) % r
+            context = (bits, r - 1, nPrime, r * r % modulo)
+            self.contexts[modulo] = context
+
+        return context
+
+
+class FixedBaseTable:
+    """
+    Precomputed powers of a fixed base, for repeated exponentiations of the same
+    base (e.g. a Diffie-Hellman generator)
+
+    The table holds base^(d * 2^(k*i)) for every k-bit digit d and position i,
+    so an exponentiation only needs one multiplication per digit and no squaring
+    """
+
+    def __init__(self, base: int, modulo: int, maxBits: int, windowSize: int = 4) -> None:
+        self.base: int = base
+        self.modulo: int = modulo
+        self.maxBits: int = maxBits
+        self.windowSize: int = windowSize
+        self.table: list[list[int]] = []
+
+        digits = 1 << windowSize
+        power = base % modulo
+
+        for _ in range(-(-maxBits // windowSize)):
+            row = [1 % modulo, power]
+            for _ in range(digits - 2):
+                row.append(row[-1] * power % modulo)
+
+            self.table.append(row)
+            power = row[-1] * power % modulo
+
+    def pow(self, exponent: int) -> int:
+        """
+        Raises the base to the given power
+        Args:
+            exponent: the exponent (>= 0)
+        Returns:
+            the exponentiation of the base to the power of `exponent`, modulo the table's modulo
+        """
+
+        if exponent.bit_length() > self.maxBits:
+            return pow(self.base, exponent, self.modulo)
+
+        modulo = self.modulo
+        mask = (1 << self.windowSize) - 1
+        result = 1 % modulo
+
+        for row in self.table:
+            if exponent == 0:
+                break
+
+            digit = exponent & mask
+            if digit:
+                result = result * row[digit] % modulo
+
+            exponent >>= self.windowSize
+
+        return result
@@ -0,0 +1,136 @@
+import random
+from math import gcd
+
+from math_utils.primes import isPrime
+
+# Factors below this bound are found by trial division
+WHEEL_BOUND: int = 10_000
+# Offsets between the numbers coprime with 30, starting from 7
+WHEEL_INCREMENTS: tuple[int, ...] = (4, 2, 4, 2, 4, 6, 2, 6)
+
+
+def factorize(n: int) -> dict[int, int]:
+    """
+    Computes the prime factorization of a number
+
+    Small factors are removed by trial division with a 2*3*5 wheel, the
+    remaining cofactor is split with Pollard's rho (Brent's variant) and each
+    part is confirmed prime with Miller-Rabin
+    Args:
+        n: the number to factorize
+    Returns:
+        a dictionary mapping each prime factor to its multiplicity (empty if `n` < 2)
+    """
+
+    factors: dict[int, int] = {}
+
+    if n < 2:
+        return factors
+
+    n = trialDivision(n, factors)
+
+    pending = [n] if n > 1 else []
+    while len(pending) != 0:
+        m = pending.pop()
+
+        if isPrime(m):
+            factors[m] = factors.get(m, 0) + 1
+            continue
+
+        d = pollardBrent(m)
+        pending.append(d)
+        pending.append(m // d)
+
+    return dict(sorted(factors.items()))
+
+
+def trialDivision(n: int, factors: dict[int, int], bound: int = WHEEL_BOUND) -> int:
+    """
+    Removes the prime factors below `bound` from a number
+    Args:
+        n: the number to factorize
+        factors: the dictionary to which found factors (and their multiplicity) are added
+        bound: the exclusive upper bound of the divisors to try
+    Returns:
+        the cofactor, free of any prime factor below `bound`
+    """
+
+    for p in (2, 3, 5):
+        while n % p == 0:
+            n //= p
+            factors[p] = factors.get(p, 0) + 1
+
+    p = 7
+    i = 0
+    while p < bound and p * p <= n:
+        while n % p == 0:
+            n //= p
+            factors[p] = factors.get(p, 0) + 1
+
+        p += WHEEL_INCREMENTS[i]
+        i = (i + 1) & 7
+
+    # The cofactor is prime if it has no factor up to its square root
+    if 1 < n < p * p:
+        factors[n] = factors.get(n, 0) + 1
+        return 1
+
+    return n
+
+
+def pollardBrent(n: int) -> int:
+    """
+    Finds a non-trivial factor of a composite number with Brent's variant
+    of Pollard's rho algorithm
+    Args:
+        n: the composite number (> 3)
+    Returns:
+        a factor of `n`, strictly between 1 and `n`
+    """
+
+    if n % 2 == 0:
+        return 2
+
+    batchSize = 128
+
+    while True:
+        y = random.randrange(1, n)
+        c = random.randrange(1, n)
+        g = r = q = 1
+        x = ys = y
+
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(batchSize, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+
+                g = gcd(q, n)
+                k += batchSize
+
+            r *= 2
+
+        # The batch overshot, backtrack one step at a time
+        if g == n:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = gcd(abs(x - ys), n)
+
+        if g != n:
+            return g
+
+
+if __name__ == "__main__":
+    import time
+
+    for value in (234, 5000 - 1, 2 ** 32 - 1, 600851475143, 2 ** 64 + 1, (2 ** 31 - 1) * (2 ** 61 - 1) * 3 ** 5):
+        start = time.perf_counter()
+        result = factorize(value)
+        print(f"{value} = {result} ({(time.perf_counter() - start) * 1000:.2f}ms)")
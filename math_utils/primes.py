@@ -1,15 +1,42 @@
-from math import sqrt
+import random
+import secrets
+from math import isqrt, prod
+from typing import Iterable
+
+# Numbers below this limit are answered from a cached sieve
+SIEVE_LIMIT: int = 1 << 20
+SEGMENT_SIZE: int = 1 << 16
+# Miller-Rabin with these bases is deterministic for every n < 3.3 * 10^24 (thus all 64-bit values)
+DETERMINISTIC_BASES: tuple[int, ...] = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+DETERMINISTIC_LIMIT: int = 1 << 64
+PROBABILISTIC_ROUNDS: int = 40
+# Random prime search: number of odd candidates sieved at once and bound of the primes used to sieve them
+SEARCH_WINDOW: int = 4096
+SEARCH_SIEVE_BOUND: int = 1 << 16
+
+_sieve: bytearray = bytearray()
+_smallPrimesProduct: int = 0
+_searchSievePrimes: list[int] = []
 
 
 def getLargestPrime(maxValue: int) -> int:
     """
     Finds the largest prime number <= maxValue
+
+    Uses the cached sieve for small values and Miller-Rabin on odd
+    candidates for larger ones
     Args:
         maxValue: the maximum value
     Returns:
         the largest prime <= `maxValue`
     """
 
+    if maxValue <= 2:
+        return 2
+
+    if maxValue < SIEVE_LIMIT:
+        return getSieve(maxValue + 1).rfind(1, 0, maxValue + 1)
+
     # If `maxValue` is even, change to the previous odd value
     if maxValue % 2 == 0:
         maxValue -= 1
@@ -25,23 +52,334 @@ def getLargestPrime(maxValue: int) -> int:
 def isPrime(n: int) -> bool:
     """
     Checks whether the given number is prime
+
+    Small numbers are looked up in the cached sieve, 64-bit values use a
+    deterministic Miller-Rabin test and larger values a probabilistic one
     Args:
         n: the number to check
     Returns:
         True if the number is prime, False otherwise
     """
 
-    if n <= 1:
+    if n < 2:
+        return False
+
+    if n < SIEVE_LIMIT:
+        return getSieve(SIEVE_LIMIT)[n] == 1
+
+    if n & 1 == 0 or gcd(n, getSmallPrimesProduct()) != 1:
         return False
 
-    # Only check up to the square root for more efficiency
-    for j in range(2, int(sqrt(n))):
-        if n % j == 0:
+    if n < DETERMINISTIC_LIMIT:
+        return millerRabin(n, DETERMINISTIC_BASES)
+
+    return isProbablePrime(n)
+
+
+def isProbablePrime(n: int, rounds: int = PROBABILISTIC_ROUNDS) -> bool:
+    """
+    Checks whether the given number is prime using Miller-Rabin with random bases
+
+    The probability that a composite number passes is at most 4^-`rounds`
+    Args:
+        n: the number to check
+        rounds: the number of random bases to try
+    Returns:
+        True if the number is probably prime, False if it is composite
+    """
+
+    if n < 4:
+        return n >= 2
+
+    bases = [random.randrange(2, n - 1) for _ in range(rounds)]
+    return millerRabin(n, bases)
+
+
+def getRandomPrime(bits: int) -> int:
+    """
+    Generates a random probable prime of exactly the given bit length
+
+    The two most significant bits are set so that the product of two such
+    primes has exactly twice as many bits. Candidates following a random
+    starting point are first sieved by the primes below `SEARCH_SIEVE_BOUND`,
+    then a base-2 Fermat test rejects most remaining composites, only the
+    candidates passing it are tested with Miller-Rabin
+    Args:
+        bits: the bit length of the prime (>= 2)
+    Returns:
+        a random prime in [2^(bits-1), 2^bits)
+    Raises:
+        ValueError: if `bits` is less than 2
+    """
+
+    if bits < 2:
+        raise ValueError("A prime has at least 2 bits")
+
+    if bits == 2:
+        return secrets.choice((2, 3))
+
+    # Small candidates could be one of the sieving primes themselves
+    if bits < 2 * SEARCH_SIEVE_BOUND.bit_length():
+        while True:
+            candidate = secrets.randbits(bits) | (1 << (bits - 1)) | 1
+            if isPrime(candidate):
+                return candidate
+
+    rounds = getMillerRabinRounds(bits)
+    sievePrimes = getSearchSievePrimes()
+
+    while True:
+        start = secrets.randbits(bits) | (3 << (bits - 2)) | 1
+
+        # window[i] tells whether start + 2i may be prime
+        window = bytearray([1]) * SEARCH_WINDOW
+        for p in sievePrimes:
+            # start + 2i = 0 (mod p) <=> i = -start * 2^-1 (mod p)
+            first = (p - start % p) * ((p + 1) // 2) % p
+            window[first::p] = bytes(len(range(first, SEARCH_WINDOW, p)))
+
+        i = window.find(1)
+        while i != -1:
+            candidate = start + 2 * i
+            if candidate.bit_length() != bits:
+                break
+
+            # Exponentiations of 2 are cheaper than those of random bases
+            if pow(2, candidate - 1, candidate) == 1 and isProbablePrime(candidate, rounds):
+                return candidate
+
+            i = window.find(1, i + 1)
+
+
+def getRandomSafePrime(bits: int) -> int:
+    """
+    Generates a random safe prime p = 2q + 1 (with q prime) of exactly the given bit length
+
+    Candidates for q are sieved so that neither q nor 2q + 1 has a factor
+    below `SEARCH_SIEVE_BOUND`, then a base-2 Fermat test on both filters
+    most remaining composites before the Miller-Rabin tests
+    Args:
+        bits: the bit length of the safe prime (>= 3)
+    Returns:
+        a random safe prime in [2^(bits-1), 2^bits)
+    Raises:
+        ValueError: if `bits` is less than 3
+    """
+
+    if bits < 3:
+        raise ValueError("A safe prime has at least 3 bits")
+
+    if bits == 3:
+        return secrets.choice((5, 7))
+
+    # Small candidates could be one of the sieving primes themselves
+    if bits < 2 * SEARCH_SIEVE_BOUND.bit_length():
+        while True:
+            q = getRandomPrime(bits - 1)
+            if isPrime(2 * q + 1):
+                return 2 * q + 1
+
+    rounds = getMillerRabinRounds(bits)
+    sievePrimes = getSearchSievePrimes()
+
+    while True:
+        start = secrets.randbits(bits - 1) | (1 << (bits - 2)) | 1
+
+        # window[i] tells whether q = start + 2i and 2q + 1 may both be prime
+        window = bytearray([1]) * SEARCH_WINDOW
+        for p in sievePrimes:
+            halfInverse = (p + 1) // 2
+            # q = 0 (mod p)
+            first = (p - start % p) * halfInverse % p
+            window[first::p] = bytes(len(range(first, SEARCH_WINDOW, p)))
+            # 2q + 1 = 0 (mod p) <=> q = (p - 1) / 2 (mod p)
+            first = ((p - 1) // 2 - start) % p * halfInverse % p
+            window[first::p] = bytes(len(range(first, SEARCH_WINDOW, p)))
+
+        i = window.find(1)
+        while i != -1:
+            q = start + 2 * i
+            p = 2 * q + 1
+            if p.bit_length() != bits:
+                break
+
+            if pow(2, q - 1, q) == 1 and pow(2, p - 1, p) == 1:
+                if isProbablePrime(q, rounds) and isProbablePrime(p, rounds):
+                    return p
+
+            i = window.find(1, i + 1)
+
+
+def getMillerRabinRounds(bits: int) -> int:
+    """
+    Returns the number of Miller-Rabin rounds needed for a randomly chosen
+    candidate of the given size to be composite with probability < 2^-100
+    (see FIPS 186-4, appendix C.3)
+    Args:
+        bits: the bit length of the candidate
+    Returns:
+        the number of rounds
+    """
+
+    if bits >= 1536:
+        return 4
+    if bits >= 1024:
+        return 5
+    if bits >= 512:
+        return 8
+    return PROBABILISTIC_ROUNDS
+
+
+def millerRabin(n: int, bases: Iterable[int]) -> bool:
+    """
+    Runs the Miller-Rabin primality test for the given bases
+    Args:
+        n: the odd number to check (> 2)
+        bases: the witnesses to try
+    Returns:
+        False if one of the bases proves that `n` is composite, True otherwise
+    """
+
+    # n - 1 = d * 2^s with d odd
+    d: int = n - 1
+    s: int = 0
+    while d & 1 == 0:
+        d >>= 1
+        s += 1
+
+    for a in bases:
+        a %= n
+        if a == 0:
+            continue
+
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+
+        else:
             return False
 
     return True
 
 
+def getSieve(limit: int) -> bytearray:
+    """
+    Returns a cached sieve of Eratosthenes covering at least [0, limit)
+
+    The sieve is extended (doubling its size) when a larger limit is requested
+    Args:
+        limit: the exclusive upper bound of the numbers to cover
+    Returns:
+        a bytearray where the value at index `i` is 1 if `i` is prime, 0 otherwise
+    """
+
+    global _sieve
+
+    if len(_sieve) < limit:
+        size = max(limit, 2 * len(_sieve))
+        sieve = bytearray([1]) * size
+        sieve[:2] = b"\0\0"
+
+        for i in range(2, isqrt(size - 1) + 1):
+            if sieve[i]:
+                sieve[i * i::i] = bytes(len(range(i * i, size, i)))
+
+        _sieve = sieve
+
+    return _sieve
+
+
+def getPrimesBelow(limit: int) -> list[int]:
+    """
+    Lists the prime numbers < limit using the cached sieve
+    Args:
+        limit: the exclusive upper bound
+    Returns:
+        the sorted list of primes < `limit`
+    """
+
+    sieve = getSieve(limit)
+    return [i for i in range(2, limit) if sieve[i]]
+
+
+def primesInRange(low: int, high: int) -> list[int]:
+    """
+    Lists the prime numbers in [low, high) using a segmented sieve
+
+    Only the base primes up to sqrt(high) are kept in memory, the range is
+    sieved in segments of `SEGMENT_SIZE` numbers
+    Args:
+        low: the inclusive lower bound
+        high: the exclusive upper bound
+    Returns:
+        the sorted list of primes in the range
+    """
+
+    low = max(low, 2)
+    if high <= low:
+        return []
+
+    if high <= SIEVE_LIMIT:
+        sieve = getSieve(high)
+        return [i for i in range(low, high) if sieve[i]]
+
+    basePrimes = getPrimesBelow(isqrt(high - 1) + 1)
+    primes = []
+
+    for segmentLow in range(low, high, SEGMENT_SIZE):
+        segmentHigh = min(segmentLow + SEGMENT_SIZE, high)
+        size = segmentHigh - segmentLow
+        segment = bytearray([1]) * size
+
+        for p in basePrimes:
+            if p * p >= segmentHigh:
+                break
+
+            start = max(p * p, (segmentLow + p - 1) // p * p) - segmentLow
+            segment[start::p] = bytes(len(range(start, size, p)))
+
+        primes += [segmentLow + i for i in range(size) if segment[i]]
+
+    return primes
+
+
+def getSearchSievePrimes() -> list[int]:
+    """
+    Returns the (cached) odd primes below `SEARCH_SIEVE_BOUND`, used to sieve
+    random prime candidates
+    Returns:
+        the odd primes < `SEARCH_SIEVE_BOUND`
+    """
+
+    global _searchSievePrimes
+
+    if len(_searchSievePrimes) == 0:
+        _searchSievePrimes = getPrimesBelow(SEARCH_SIEVE_BOUND)[1:]
+
+    return _searchSievePrimes
+
+
+def getSmallPrimesProduct() -> int:
+    """
+    Returns the (cached) product of the primes below 1000, used to quickly
+    reject candidates with a small factor
+    Returns:
+        the product of the primes < 1000
+    """
+
+    global _smallPrimesProduct
+
+    if _smallPrimesProduct == 0:
+        _smallPrimesProduct = prod(getPrimesBelow(1000))
+
+    return _smallPrimesProduct
+
+
 def areCoprimes(a: int, b: int) -> bool:
     """
     Checks whether two numbers are coprime
@@ -73,16 +411,29 @@ def gcd(a: int, b: int) -> int:
     return a
 
 
-def getPrimeFactors(n) -> list[int]:
-    primeFactors = []
-    for i in range(2, n):
-        while n % i == 0:
-            n /= i
-            primeFactors.append(i)
-    return primeFactors
+def getPrimeFactors(n: int) -> list[int]:
+    """
+    Lists the prime factors of a number, repeated according to their multiplicity
+    Args:
+        n: the number to factorize
+    Returns:
+        the sorted list of prime factors of `n` (empty if `n` < 2)
+    """
+
+    # Imported here since the factorization module depends on this one
+    from math_utils.factorization import factorize
+
+    return [p for p, multiplicity in factorize(n).items() for _ in range(multiplicity)]
 
 
 if __name__ == '__main__':
     print(gcd(144, 60))
     print(gcd(15, 40))
     print(getPrimeFactors(234))
+
+    import time
+    for value in (20_000, 5_000_000, 10 ** 12, 2 ** 61, 2 ** 521):
+        t1 = time.perf_counter()
+        prime = getLargestPrime(value)
+        t2 = time.perf_counter()
+        print(f"largest prime <= {value}: {prime} ({(t2 - t1) * 1000:.3f}ms)")
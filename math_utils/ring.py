@@ -1,11 +1,17 @@
+import operator
+from itertools import repeat
+from typing import Optional, Union, Sequence, Iterable
+
+from math_utils.exponentiation import PowEngine, BuiltinPowEngine, FixedBaseTable
 from math_utils.modulo import getModularInverse
 
 
 class Ring:
     """Class representing a ring"""
 
-    def __init__(self, modulo: int) -> None:
+    def __init__(self, modulo: int, engine: Optional[PowEngine] = None) -> None:
         self.modulo: int = modulo
+        self.engine: PowEngine = BuiltinPowEngine() if engine is None else engine
 
     def add(self, a: int, b: int) -> int:
         """
@@ -63,7 +69,7 @@ class Ring:
 
     def fastPow(self, a: int, b: int) -> int:
         """
-        Raises a number to the given power using a fast algorithm
+        Raises a number to the given power using the ring's exponentiation engine
         Args:
             a: the base
             b: the exponent
@@ -71,18 +77,106 @@ class Ring:
             the exponentiation of `a` to the power of `b`
         """
 
-        result = 1
-        currentPower: int = a % self.modulo
-        powerSelect: int = b
+        return self.engine.pow(a, b, self.modulo)
+
+    def fixedBase(self, base: int, maxBits: Optional[int] = None, windowSize: int = 4) -> FixedBaseTable:
+        """
+        Precomputes the powers of a base which will be raised to many different exponents
+        Args:
+            base: the base
+            maxBits: the maximum bit length of the exponents. If None, uses the bit length of the modulo
+            windowSize: the number of exponent bits handled by each table lookup
+        Returns:
+            the table of precomputed powers, whose `pow` method computes base^exponent in this ring
+        """
+
+        if maxBits is None:
+            maxBits = self.modulo.bit_length()
+
+        return FixedBaseTable(base, self.modulo, maxBits, windowSize)
+
+    def addArray(self, a: Union[Sequence[int], int], b: Union[Sequence[int], int]) -> list[int]:
+        """
+        Adds numbers element-wise
+        Args:
+            a: the first numbers (or a single number, added to every element of `b`)
+            b: the second numbers (or a single number, added to every element of `a`)
+
+        Returns:
+            the sums of `a` and `b`
+        """
+        return self._reduceArray(map(operator.add, *self._broadcast(a, b)))
+
+    def subArray(self, a: Union[Sequence[int], int], b: Union[Sequence[int], int]) -> list[int]:
+        """
+        Subtracts numbers element-wise
+        Args:
+            a: the first numbers (or a single number)
+            b: the numbers to subtract (or a single number)
 
-        while powerSelect != 0:
-            if powerSelect & 1:
-                result = self.multiply(result, currentPower)
+        Returns:
+            the differences of `a` and `b`
+        """
+        return self._reduceArray(map(operator.sub, *self._broadcast(a, b)))
 
-            currentPower = self.multiply(currentPower, currentPower)
-            powerSelect >>= 1
+    def mulArray(self, a: Union[Sequence[int], int], b: Union[Sequence[int], int]) -> list[int]:
+        """
+        Multiplies numbers element-wise
+        Args:
+            a: the first numbers (or a single number, multiplied with every element of `b`)
+            b: the second numbers (or a single number, multiplied with every element of `a`)
 
-        return result
+        Returns:
+            the products of `a` and `b`
+        """
+        return self._reduceArray(map(operator.mul, *self._broadcast(a, b)))
+
+    def powArray(self, values: Sequence[int], exponent: Union[Sequence[int], int]) -> list[int]:
+        """
+        Raises numbers to the given power(s) element-wise
+
+        With a single exponent, each distinct value is only exponentiated once
+        Args:
+            values: the bases
+            exponent: the exponent of every base (or one exponent per base)
+
+        Returns:
+            the exponentiations of `values` to the power of `exponent`
+        """
+
+        if not isinstance(exponent, int):
+            return list(map(self.engine.pow, values, exponent, repeat(self.modulo)))
+
+        powers = {value: self.engine.pow(value, exponent, self.modulo) for value in set(values)}
+        return list(map(powers.__getitem__, values))
+
+    def _reduceArray(self, values: Iterable[int]) -> list[int]:
+        return list(map(self.modulo.__rmod__, values))
+
+    @staticmethod
+    def _broadcast(a: Union[Sequence[int], int], b: Union[Sequence[int], int]) -> tuple[Iterable[int], Iterable[int]]:
+        """
+        Prepares two operands of an element-wise operation, repeating single numbers
+        Args:
+            a: the first operand
+            b: the second operand
+
+        Returns:
+            the two operands as iterables
+        Raises:
+            ValueError: if both operands are sequences of different lengths
+        """
+
+        if isinstance(a, int):
+            return repeat(a), b
+
+        if isinstance(b, int):
+            return a, repeat(b)
+
+        if len(a) != len(b):
+            raise ValueError(f"Operands must have the same length ({len(a)} != {len(b)})")
+
+        return a, b
 
     def inverse(self, a: int) -> int:
         """
@@ -96,12 +190,44 @@ class Ring:
         return getModularInverse(a, self.modulo)
 
 if __name__ == "__main__":
-    ring = Ring(17)
+    import random
     import time
+
+    from math_utils.exponentiation import SquareMultiplyEngine, SlidingWindowEngine, MontgomeryEngine
+    from math_utils.primes import getRandomPrime
+
+    ring = Ring(17)
     t1 = time.time()
     print(ring.pow(120, 23000875))
     t2 = time.time()
     print(ring.fastPow(120, 23000875))
     t3 = time.time()
     print(f"pow: {t2-t1:.5f}s")
-    print(f"fast pow: {t3-t2:.5f}s")
\ No newline at end of file
+    print(f"fast pow: {t3-t2:.5f}s")
+
+    engines = [BuiltinPowEngine(), SquareMultiplyEngine(), SlidingWindowEngine(), MontgomeryEngine()]
+
+    for bits in (32, 512, 1024, 2048):
+        modulo = getRandomPrime(bits)
+        runs = max(5, 20_000 // bits)
+        values = [(random.randrange(modulo), random.randrange(modulo)) for _ in range(runs)]
+        expected = [pow(a, b, modulo) for a, b in values]
+
+        print(f"{bits}-bit modulo ({runs} runs)")
+        for engine in engines:
+            ring = Ring(modulo, engine)
+            start = time.perf_counter()
+            results = [ring.fastPow(a, b) for a, b in values]
+            duration = (time.perf_counter() - start) / runs
+            assert results == expected
+            print(f"  {engine.NAME:>16}: {duration * 1e6:10.1f}us")
+
+        base = values[0][0]
+        start = time.perf_counter()
+        table = Ring(modulo).fixedBase(base)
+        setup = time.perf_counter() - start
+        start = time.perf_counter()
+        results = [table.pow(b) for _, b in values]
+        duration = (time.perf_counter() - start) / runs
+        assert results == [pow(base, b, modulo) for _, b in values]
+        print(f"  {'fixed-base':>16}: {duration * 1e6:10.1f}us (table built in {setup * 1000:.1f}ms)")
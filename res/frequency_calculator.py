@@ -1,45 +1,187 @@
+import argparse
 import json
 import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Optional
 
+# Size of the corpus parts counted by each worker, in bytes
+CHUNK_SIZE: int = 16 * 1024 * 1024
+NGRAM_SIZES: tuple[int, ...] = (2, 3)
+LINE_BREAKS: str = "\r\n"
 
-def computeFrequencies(path: str) -> dict:
+
+def getChunkBounds(path: str, chunkSize: int = CHUNK_SIZE) -> list[tuple[int, int]]:
+    """
+    Splits a file into chunks of about `chunkSize` bytes ending on a line break
+
+    Since chunks never cut a line, they never cut a UTF-8 character either
+    Args:
+        path: the input file path
+        chunkSize: the approximate size of each chunk, in bytes
+    Returns:
+        the (start, end) byte offsets of each chunk
+    """
+
+    size = os.path.getsize(path)
+    bounds = []
+
+    with open(path, "rb") as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + chunkSize, size))
+            f.readline()
+            end = min(f.tell(), size)
+            bounds.append((start, end))
+            start = end
+
+    return bounds
+
+
+def countChunk(path: str, start: int, end: int, ngramSizes: tuple[int, ...] = NGRAM_SIZES) -> tuple[Counter, dict[int, Counter]]:
+    """
+    Counts the characters and n-grams of a part of a file
+
+    Line breaks are not counted and n-grams do not span several lines
+    Args:
+        path: the input file path (UTF-8)
+        start: the offset of the first byte of the chunk
+        end: the offset after the last byte of the chunk
+        ngramSizes: the sizes of the n-grams to count
+    Returns:
+        the count of each character and, for each n-gram size, the count of each n-gram
+    """
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+
+    counts = Counter(text)
+    for char in LINE_BREAKS:
+        counts.pop(char, None)
+
+    ngramCounts = {}
+    for n in ngramSizes:
+        ngrams = Counter(map("".join, zip(*(text[i:] for i in range(n)))))
+        for ngram in [ngram for ngram in ngrams if any(char in ngram for char in LINE_BREAKS)]:
+            del ngrams[ngram]
+
+        ngramCounts[n] = ngrams
+
+    return counts, ngramCounts
+
+
+def computeCounts(path: str,
+                  ngramSizes: tuple[int, ...] = NGRAM_SIZES,
+                  workers: Optional[int] = None,
+                  chunkSize: int = CHUNK_SIZE) -> tuple[Counter, dict[int, Counter]]:
+    """
+    Counts the characters and n-grams of a file, chunk by chunk
+
+    Chunks are counted by a pool of processes (each one reading its own
+    chunk) and the partial counts are merged
+    Args:
+        path: the input file path (UTF-8)
+        ngramSizes: the sizes of the n-grams to count
+        workers: the maximum number of processes. If None, uses the number of CPUs
+        chunkSize: the approximate size of each chunk, in bytes
+    Returns:
+        the count of each character and, for each n-gram size, the count of each n-gram
+    """
+
+    bounds = getChunkBounds(path, chunkSize)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    workers = min(workers, len(bounds))
+
+    counts = Counter()
+    ngramCounts = {n: Counter() for n in ngramSizes}
+
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(countChunk, repeat(path), *zip(*bounds), repeat(ngramSizes))
+    else:
+        executor = None
+        results = (countChunk(path, start, end, ngramSizes) for start, end in bounds)
+
+    try:
+        for chunkCounts, chunkNgramCounts in results:
+            counts.update(chunkCounts)
+            for n, ngrams in chunkNgramCounts.items():
+                ngramCounts[n].update(ngrams)
+
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return counts, ngramCounts
+
+
+def countsToFrequencies(counts: Counter) -> dict[str, float]:
+    total = sum(counts.values())
+    return {key: count / total for key, count in counts.items()}
+
+
+def computeFrequencies(path: str, workers: Optional[int] = None) -> dict:
     """
     Computes the frequency of every letter in a dictionary
     Args:
         path: the input file path
+        workers: the maximum number of processes. If None, uses the number of CPUs
 
     Returns:
         a dictionary of each letter and its frequency of appearance
     """
 
-    with open(path, "r") as f:
-        words = f.read().splitlines()
+    counts, _ = computeCounts(path, (), workers)
+    return countsToFrequencies(counts)
 
-    counts = {}
-    frequencies = {}
 
-    for word in words:
-        for c in word:
-            if c not in counts:
-                counts[c] = 0
-            counts[c] += 1
+def computeNgramFrequencies(path: str,
+                            ngramSizes: tuple[int, ...] = NGRAM_SIZES,
+                            workers: Optional[int] = None) -> tuple[dict[str, float], dict[int, dict[str, float]]]:
+    """
+    Computes the frequency of every letter and n-gram in a corpus
+    Args:
+        path: the input file path
+        ngramSizes: the sizes of the n-grams to count
+        workers: the maximum number of processes. If None, uses the number of CPUs
+    Returns:
+        the frequency of each letter and, for each n-gram size, the frequency of each n-gram
+    """
 
-    total = sum(counts.values())
-    for char, count in counts.items():
-        frequencies[char] = count / total
+    counts, ngramCounts = computeCounts(path, ngramSizes, workers)
 
-    return frequencies
+    return countsToFrequencies(counts), {
+        n: countsToFrequencies(ngrams)
+        for n, ngrams in ngramCounts.items()
+        if len(ngrams) != 0
+    }
 
 
 if __name__ == '__main__':
-    filename = input("Dictionary file name: ")
-    filename = os.path.basename(filename)
+    parser = argparse.ArgumentParser(description="Computes the letter and n-gram frequencies of a corpus")
+    parser.add_argument("corpus", help="UTF-8 text file")
+    parser.add_argument("-n", "--ngrams", type=int, nargs="*", default=list(NGRAM_SIZES), help="n-gram sizes to count")
+    parser.add_argument("-w", "--workers", type=int, help="number of processes, defaults to the number of CPUs")
+    args = parser.parse_args()
+
+    filename = os.path.basename(args.corpus)
     name = os.path.splitext(filename)[0]
-    inpath = os.path.abspath(filename)
     outpath = os.path.abspath(name + "_freq.json")
-    frequencies = computeFrequencies(inpath)
+    ngramsPath = os.path.abspath(name + "_ngrams.json")
+    frequencies, ngramFrequencies = computeNgramFrequencies(os.path.abspath(args.corpus), tuple(args.ngrams), args.workers)
 
-    with open(outpath, "w") as f:
+    with open(outpath, "w", encoding="utf-8") as f:
         json.dump(frequencies, f, indent=4)
 
     print(f"Saved in {outpath}")
+
+    if len(ngramFrequencies) != 0:
+        with open(ngramsPath, "w", encoding="utf-8") as f:
+            json.dump({str(n): ngrams for n, ngrams in ngramFrequencies.items()}, f, indent=4, ensure_ascii=False)
+
+        print(f"Saved n-grams in {ngramsPath}")
@@ -0,0 +1,301 @@
+import argparse
+import asyncio
+import random
+import re
+import string
+from typing import Union, Optional
+
+from ansi import ANSI
+from client.protocol import Protocol, ProtocolError
+from crypto.rsa_encryption import RSAEncryption
+from logger import Logger
+from utils import formatException
+
+
+class MockServer:
+    """
+    Local stand-in for the ISC task server
+
+    Text and image messages are broadcast to every connected client, server
+    messages run the shift, Vigenère, RSA and Diffie-Hellman task dialogues
+    """
+
+    ENCODE_SUCCESS = "The encoding is correct !"
+    ENCODE_FAILURE = "The encoding is invalid !"
+    DECODE_SUCCESS = "The message is correct !"
+    DECODE_FAILURE = "The message is incorrect !"
+    DIFHEL_SUCCESS = "The shared secret has been validated !"
+    DIFHEL_FAILURE = "The shared secret is not the same as the server, try again"
+
+    ALPHABET = string.ascii_letters + " "
+    MAX_SIZE = 0xFFFF
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6000) -> None:
+        self.host: str = host
+        self.port: int = port
+        self.server: Optional[asyncio.Server] = None
+        self.sessions: set[MockSession] = set()
+        self.logger = Logger("MockServer", styles={
+            "info": [],
+            "error": [ANSI.RED, ANSI.BOLD],
+            "warning": [ANSI.YELLOW, ANSI.ITALIC],
+            "success": [ANSI.LGREEN, ANSI.ITALIC]
+        })
+
+    async def start(self) -> None:
+        """
+        Starts listening for connections
+
+        If the port is 0, it is replaced by the port chosen by the system
+        """
+
+        self.server = await asyncio.start_server(self.handleConnection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.logger.info(f"Listening on {self.host}:{self.port}")
+
+    async def serveForever(self) -> None:
+        """
+        Starts the server and handles connections until cancelled
+        """
+
+        if self.server is None:
+            await self.start()
+
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self) -> None:
+        """
+        Stops the server and closes every connection
+        """
+
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+        for session in list(self.sessions):
+            session.writer.close()
+
+    async def handleConnection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = MockSession(self, reader, writer)
+        self.sessions.add(session)
+
+        try:
+            await session.run()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ProtocolError as e:
+            self.logger.error("Received invalid message")
+            self.logger.error(formatException(e))
+        finally:
+            self.sessions.discard(session)
+            writer.close()
+
+    async def broadcast(self, frame: bytes) -> None:
+        """
+        Sends a frame to every connected client
+        Args:
+            frame: the encoded message
+        """
+
+        for session in list(self.sessions):
+            session.writer.write(frame)
+
+        for session in list(self.sessions):
+            try:
+                await session.writer.drain()
+            except ConnectionError:
+                self.sessions.discard(session)
+
+
+class MockSession:
+    """Connection of a single client to the `MockServer`"""
+
+    def __init__(self, server: MockServer, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.server: MockServer = server
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+
+    async def run(self) -> None:
+        """
+        Handles the commands of the client until it disconnects
+        """
+
+        while True:
+            command = await self.receive()
+            match = re.fullmatch(r"task (\w+)(?: (encode|decode) (\d+))?", command.strip())
+
+            if match is None:
+                await self.send(f"Unknown command '{command}'")
+                continue
+
+            name, mode, size = match.group(1), match.group(2), match.group(3)
+            size = 0 if size is None else int(size)
+
+            if name == "DifHel" and mode is None:
+                await self.difHelTask()
+
+            elif mode is None or not 1 <= size <= MockServer.MAX_SIZE:
+                await self.send(f"Invalid task '{command}'")
+
+            elif name == "shift" and mode == "encode":
+                await self.shiftEncodeTask(size)
+
+            elif name == "vigenere" and mode == "encode":
+                await self.vigenereEncodeTask(size)
+
+            elif name == "RSA" and mode == "encode":
+                await self.rsaEncodeTask(size)
+
+            elif name == "RSA" and mode == "decode":
+                await self.rsaDecodeTask(size)
+
+            else:
+                await self.send(f"Unsupported task '{command}'")
+
+    async def receiveFrame(self) -> bytes:
+        """
+        Reads a complete frame from the client
+        Returns:
+            the frame bytes (magic, type, length and payload)
+        Raises:
+            ProtocolError: if the payload is malformed (missing magic bytes, invalid message type, etc.)
+            asyncio.IncompleteReadError: if the client disconnected
+        """
+
+        msgBytes = await self.reader.readexactly(len(Protocol.MAGIC) + 1)
+        lengthBytes = Protocol.getPayloadLengthBytesCount(msgBytes)
+
+        msgBytes += await self.reader.readexactly(lengthBytes)
+        payloadLength = Protocol.getPayloadLength(msgBytes)
+
+        msgBytes += await self.reader.readexactly(payloadLength)
+
+        return msgBytes
+
+    async def receive(self, rawBytes: bool = False) -> Union[str, bytes]:
+        """
+        Waits for the next server message, broadcasting any other message received meanwhile
+        Args:
+            rawBytes: if true, the payload bytes are returned without the length prefix instead of being decoded
+        Returns:
+            the message sent by the client to the server
+        """
+
+        while True:
+            frame = await self.receiveFrame()
+
+            if Protocol.getMessageType(frame) != Protocol.SERVER:
+                await self.server.broadcast(frame)
+                continue
+
+            if rawBytes:
+                return Protocol.decode(frame, True)[2:]
+
+            return Protocol.decode(frame)
+
+    async def send(self, msg: Union[str, bytes]) -> None:
+        self.writer.write(Protocol.encode(msg, True))
+        await self.writer.drain()
+
+    async def shiftEncodeTask(self, size: int) -> None:
+        key = random.randint(1, 100)
+        plaintext = self.randomText(size)
+        expected = b"".join(Protocol.intToPaddedBytes(Protocol.charToInt(c) + key) for c in plaintext)
+
+        await self.send(f"Encode the following message using a shift of {key}")
+        await self.send(plaintext)
+        await self.checkEncoding(expected)
+
+    async def vigenereEncodeTask(self, size: int) -> None:
+        key = self.randomText(random.randint(3, 8), string.ascii_uppercase)
+        plaintext = self.randomText(size)
+        expected = b"".join(
+            Protocol.intToPaddedBytes(Protocol.charToInt(c) + Protocol.charToInt(key[i % len(key)]))
+            for i, c in enumerate(plaintext)
+        )
+
+        await self.send(f"Encode the following message using the Vigenère key {key}")
+        await self.send(plaintext)
+        await self.checkEncoding(expected)
+
+    async def rsaEncodeTask(self, size: int) -> None:
+        (n, e), _ = RSAEncryption.generateKeyPair()
+        plaintext = self.randomText(size)
+        expected = b"".join(Protocol.intToPaddedBytes(pow(Protocol.charToInt(c), e, n)) for c in plaintext)
+
+        await self.send(f"Encode the following message using RSA with n={n}, e={e}")
+        await self.send(plaintext)
+        await self.checkEncoding(expected)
+
+    async def rsaDecodeTask(self, size: int) -> None:
+        await self.send("Send your public key as 'n,e' and decode the message you will receive")
+
+        keyMsg = await self.receive()
+        try:
+            n, e = map(int, keyMsg.split(","))
+            plaintext = self.randomText(size)
+            ciphertext = b"".join(Protocol.intToPaddedBytes(pow(Protocol.charToInt(c), e, n)) for c in plaintext)
+
+        except (ValueError, OverflowError):
+            await self.send(f"Invalid public key '{keyMsg}'")
+            return
+
+        await self.send(ciphertext)
+
+        decoded = await self.receive()
+        await self.send(MockServer.DECODE_SUCCESS if decoded == plaintext else MockServer.DECODE_FAILURE)
+
+    async def difHelTask(self) -> None:
+        await self.send("Send the prime p and generator g as 'p,g'")
+
+        groupMsg = await self.receive()
+        try:
+            p, g = map(int, groupMsg.split(","))
+            assert p > 2 and 1 < g < p
+
+        except (ValueError, AssertionError):
+            await self.send(f"Invalid group '{groupMsg}'")
+            return
+
+        b = random.randint(2, p - 2)
+        await self.send("Here is the server's half key g^b, send yours")
+        await self.send(str(pow(g, b, p)))
+
+        halfAMsg = await self.receive()
+        await self.send("Send the shared secret")
+
+        secretMsg = await self.receive()
+        try:
+            valid = int(secretMsg) == pow(int(halfAMsg), b, p)
+        except ValueError:
+            valid = False
+
+        await self.send(MockServer.DIFHEL_SUCCESS if valid else MockServer.DIFHEL_FAILURE)
+
+    async def checkEncoding(self, expected: bytes) -> None:
+        """
+        Receives the client's encoded message and replies whether it is correct
+        Args:
+            expected: the expected encoded payload bytes
+        """
+
+        encoded = await self.receive(True)
+        await self.send(MockServer.ENCODE_SUCCESS if encoded == expected else MockServer.ENCODE_FAILURE)
+
+    @staticmethod
+    def randomText(size: int, alphabet: str = MockServer.ALPHABET) -> str:
+        return "".join(random.choices(alphabet, k=size))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs a local stand-in for the ISC task server")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on")
+    parser.add_argument("--port", type=int, default=6000, help="port to listen on")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(MockServer(args.host, args.port).serveForever())
+    except KeyboardInterrupt:
+        pass
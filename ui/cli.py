@@ -6,6 +6,7 @@ from crypto.algorithm import Algorithm
 from crypto.rsa_encryption import RSAEncryption
 from crypto.shift_encryption import ShiftEncryption
 from crypto.vigenere_encryption import VigenereEncryption
+from crypto.xor_encryption import XOREncryption
 from logger import Logger
 from utils import formatException
 
@@ -19,7 +20,7 @@ class CLI:
         ["Manual message", None, False],
         ["Shift (encryption)", ShiftEncryption, False],
         ["Shift (decryption)", ShiftEncryption, True],
-        #["XOR (encryption)", XOREncryption, False],
+        ["XOR (encryption)", XOREncryption, False],
         #["XOR (decryption)", XOREncryption, True],
         ["Vigénère (encryption)", VigenereEncryption, False],
         ["Vigénère (decryption)", VigenereEncryption, True],
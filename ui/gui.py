@@ -474,5 +474,8 @@ if __name__ == '__main__':
 
     sys.excepthook = except_hook
 
+    RSAEncryption.createKeyPool()
+    DiffieHellman.createKeyPool()
+
     with Client(Config.HOST, Config.PORT) as client:
         GUI(client)